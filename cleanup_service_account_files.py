@@ -1,7 +1,8 @@
 """
 List and delete files created by Service Account.
 """
-from src.sheets import GoogleSheetsExporter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.sheets import get_exporter
 import gspread
 
 print("=" * 60)
@@ -9,7 +10,7 @@ print("🧹 Service Account File Cleanup")
 print("=" * 60)
 
 try:
-    exporter = GoogleSheetsExporter()
+    exporter = get_exporter()
 
     if not exporter.enabled:
         print("❌ Google Sheets not configured")
@@ -41,12 +42,18 @@ try:
 
         if response.lower() == 'yes':
             print("\n🗑️  Deleting files...")
-            for file in files:
-                try:
-                    exporter.client.del_spreadsheet(file.id)
-                    print(f"✅ Deleted: {file.title}")
-                except Exception as e:
-                    print(f"❌ Failed to delete {file.title}: {e}")
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                futures = {
+                    pool.submit(exporter.client.del_spreadsheet, file.id): file
+                    for file in files
+                }
+                for future in as_completed(futures):
+                    file = futures[future]
+                    try:
+                        future.result()
+                        print(f"✅ Deleted: {file.title}")
+                    except Exception as e:
+                        print(f"❌ Failed to delete {file.title}: {e}")
 
             print("\n✅ Cleanup complete!")
         else:
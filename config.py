@@ -2,11 +2,26 @@
 Configuration module for loading environment variables and API credentials.
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+
+@lru_cache(maxsize=1)
+def load_env_once() -> bool:
+    """
+    Load environment variables from .env file, at most once per process.
+
+    Exported variables take precedence over the file, and optional
+    settings such as DEBUG are still read from it.
+
+    Returns:
+        True if a .env file was loaded.
+    """
+    return load_dotenv(override=False)
+
+
+load_env_once()
 
 
 class Config:
@@ -25,6 +40,9 @@ class Config:
         "./credentials.json"
     )
 
+    # Show full tracebacks in the UI (logged either way)
+    DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+
     @classmethod
     def validate(cls) -> list[str]:
         """
@@ -54,3 +72,7 @@ class Config:
     def is_google_sheets_configured(cls) -> bool:
         """Check if Google Sheets API is configured."""
         return Path(cls.GOOGLE_SHEETS_CREDENTIALS_PATH).exists()
+
+
+# Missing configuration keys, computed once at import
+MISSING_CONFIG: tuple[str, ...] = tuple(Config.validate())
@@ -1,13 +1,419 @@
 """
 Escape Room Calendar Maker - Main Streamlit Application
 """
+import copy
+import csv
+import io
+import logging
+import threading
+import time
+from functools import lru_cache
 import streamlit as st
 from pathlib import Path
-from config import Config
-from src.parser import parse_reservations, parse_users
-from src.travel import NaverMapsClient
-from src.claude_agent import ClaudeScheduler, ScenarioDisplay
-from src.sheets import GoogleSheetsExporter, SheetsHelper
+from config import Config, MISSING_CONFIG
+from src.parser import (
+    parse_reservations,
+    parse_reservations_frame,
+    parse_users,
+    parse_users_frame,
+    reservations_to_frame,
+    users_to_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+# Shared falsy default for session state lookups
+_EMPTY: tuple = ()
+
+# Data editors scroll internally beyond this height (px)
+EDITOR_MAX_HEIGHT = 400
+
+# Columns of the per-scenario CSV download
+CSV_EXPORT_COLUMNS = (
+    "팀", "시작시간", "종료시간", "방이름", "테마", "참여자", "인원", "이동시간(분)", "메모",
+)
+
+# Guards pruning of the shared _memoize cache across sessions
+_MEMO_LOCK = threading.Lock()
+
+# Minimum seconds between progress redraws (at most 10 updates per second)
+PROGRESS_MIN_INTERVAL = 0.1
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_reservations(data: bytes):
+    """
+    Parse reservations CSV bytes once per file content.
+
+    Returns:
+        Tuple of (Reservation list, editable DataFrame)
+    """
+    reservations = parse_reservations(io.BytesIO(data))
+    return reservations, reservations_to_frame(reservations)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_users(data: bytes):
+    """
+    Parse users CSV bytes once per file content.
+
+    Returns:
+        Tuple of (User list, editable DataFrame)
+    """
+    users = parse_users(io.BytesIO(data))
+    return users, users_to_frame(users)
+
+
+@st.cache_resource(show_spinner=False)
+def get_travel_client():
+    """Shared Naver Maps client, reused across reruns and sessions."""
+    from src.travel import NaverMapsClient
+
+    return NaverMapsClient()
+
+
+@st.cache_resource(show_spinner=False)
+def get_claude():
+    """Shared Claude client, reused across reruns and sessions."""
+    from src.claude_agent import ClaudeScheduler
+
+    return ClaudeScheduler()
+
+
+def _service_account_email() -> str:
+    """
+    Service Account email for the sharing instructions.
+
+    Read from the shared client's credentials on each call, so a failed
+    lookup is retried instead of sticking as "N/A".
+    """
+    try:
+        from src.sheets import get_exporter
+
+        exporter = get_exporter()
+        if exporter.enabled:
+            return exporter.client.http_client.auth.service_account_email
+    except Exception:
+        pass
+    return "N/A"
+
+
+@st.cache_resource(show_spinner=False)
+def _progress_safe_cache() -> dict:
+    """
+    Process-wide results of slow calls that report progress to the UI.
+
+    st.cache_data records the elements a function updates on a cache miss
+    and replays them on a hit, which fails for progress bars created by an
+    earlier run. Results from callback-driven calls are kept here instead.
+    """
+    return {}
+
+
+def _memoize(key, compute, ttl: float, max_entries: int, cacheable=None):
+    """
+    Return compute() for key, reusing a result younger than ttl seconds.
+
+    Results are deep-copied on the way out, like st.cache_data, so callers
+    can't mutate the shared entry. If cacheable(result) is false, the
+    result is returned without being stored.
+    """
+    cache = _progress_safe_cache()
+    now = time.monotonic()
+
+    entry = cache.get(key)
+    if entry is None or now - entry[0] >= ttl:
+        entry = (now, compute())
+        if cacheable is not None and not cacheable(entry[1]):
+            return entry[1]
+
+        with _MEMO_LOCK:
+            cache[key] = entry
+            # Drop expired entries, then the oldest ones beyond max_entries
+            for stale_key in [k for k, (t, _) in cache.items() if now - t >= ttl]:
+                del cache[stale_key]
+            for stale_key in sorted(cache, key=lambda k: cache[k][0])[:-max_entries]:
+                del cache[stale_key]
+
+    return copy.deepcopy(entry[1])
+
+
+def cached_travel_matrix(addresses_key: tuple[str, ...], progress_callback=None):
+    """
+    Travel time matrix for a sorted address tuple, cached for 6 hours.
+
+    Matrices with estimated pairs (e.g. during an API outage) are not
+    cached, so the next run retries them. The progress callback only
+    fires on a cache miss.
+    """
+    client = get_travel_client()
+    return _memoize(
+        ("travel_matrix", addresses_key),
+        lambda: client.get_travel_time_matrix(
+            list(addresses_key), progress_callback=progress_callback
+        ),
+        ttl=6 * 60 * 60,
+        max_entries=32,
+        cacheable=client.is_fully_fetched,
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _example_bytes(path: str) -> bytes | None:
+    """Example CSV contents, read from disk once."""
+    example = Path(path)
+    return example.read_bytes() if example.exists() else None
+
+
+@lru_cache(maxsize=1)
+def _sheets_configured() -> bool:
+    """Google Sheets credentials probe, computed once per process."""
+    return Config.is_google_sheets_configured()
+
+
+def _scenario_to_csv_bytes(scenario: dict) -> bytes | None:
+    """
+    Encode a scenario's assignments as CSV for download.
+
+    Returns:
+        UTF-8 CSV bytes with a BOM (for Excel), or None if there are no assignments
+    """
+    # One tuple per assignment, generated lazily straight into the writer
+    rows = (
+        (
+            f"팀 {team_id}",
+            a.get("start_time", ""),
+            a.get("end_time", ""),
+            a.get("room_name", ""),
+            a.get("theme", ""),
+            ", ".join(a.get("members", ())),
+            a.get("member_count", 0),
+            a.get("travel_time_from_previous", 0),
+            a.get("notes", ""),
+        )
+        for team_id, assignments in scenario.get("teams", {}).items()
+        for a in assignments
+    )
+
+    first_row = next(rows, None)
+    if first_row is None:
+        return None
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(CSV_EXPORT_COLUMNS)
+    writer.writerow(first_row)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8-sig")
+
+
+def _throttled(callback, min_interval: float = PROGRESS_MIN_INTERVAL):
+    """
+    Wrap a progress callback so it runs at most once per min_interval.
+
+    Calls that arrive sooner are dropped, which keeps per-item callbacks
+    from sending a websocket message for every item.
+    """
+    last_call = [float("-inf")]
+
+    def wrapper(*args):
+        now = time.monotonic()
+        if now - last_call[0] < min_interval:
+            return
+        last_call[0] = now
+        callback(*args)
+
+    return wrapper
+
+
+def _editor_unchanged(key: str) -> bool:
+    """Whether the data editor with this key has no edited, added or deleted rows."""
+    state = st.session_state.get(key) or {}
+    return not (
+        state.get("edited_rows") or state.get("added_rows") or state.get("deleted_rows")
+    )
+
+
+def _editor_height(num_rows: int) -> int:
+    """Fit the data editor to its rows, capped so large tables scroll."""
+    # Header, rows and the add-row line are 35px each, plus borders
+    return min(EDITOR_MAX_HEIGHT, 35 * (num_rows + 2) + 3)
+
+
+@st.fragment
+def _reservations_editor(reservations_df):
+    """Editable reservations table; edits rerun only this fragment."""
+    edited_reservations_df = st.data_editor(
+        reservations_df,
+        num_rows="dynamic",  # Allow adding/removing rows
+        use_container_width=True,
+        height=_editor_height(len(reservations_df)),
+        key="reservations_editor",
+        column_config={
+            "방이름": st.column_config.TextColumn("방이름", required=True),
+            "시작시간": st.column_config.DatetimeColumn(
+                "시작시간",
+                required=True,
+                format="YYYY-MM-DD HH:mm",
+                help="날짜와 시간을 선택하세요"
+            ),
+            "종료시간": st.column_config.DatetimeColumn(
+                "종료시간",
+                required=True,
+                format="YYYY-MM-DD HH:mm",
+                help="날짜와 시간을 선택하세요"
+            ),
+            "주소": st.column_config.TextColumn("주소", required=True),
+            "테마": st.column_config.TextColumn("테마", required=True),
+            "최소인원": st.column_config.NumberColumn("최소인원", min_value=1, max_value=20, required=True),
+            "적정인원": st.column_config.NumberColumn("적정인원", min_value=1, max_value=20, required=True),
+            "최대인원": st.column_config.NumberColumn("최대인원", min_value=1, max_value=20, required=True),
+        }
+    )
+
+    return edited_reservations_df
+
+
+@st.fragment
+def _users_editor(users_df):
+    """Editable users table; edits rerun only this fragment."""
+    edited_users_df = st.data_editor(
+        users_df,
+        num_rows="dynamic",  # Allow adding/removing rows
+        use_container_width=True,
+        height=_editor_height(len(users_df)),
+        key="users_editor",
+        column_config={
+            "이름": st.column_config.TextColumn("이름", required=True),
+            "참여시작시간": st.column_config.DatetimeColumn(
+                "참여시작시간",
+                required=True,
+                format="YYYY-MM-DD HH:mm",
+                help="날짜와 시간을 선택하세요"
+            ),
+            "참여종료시간": st.column_config.DatetimeColumn(
+                "참여종료시간",
+                required=True,
+                format="YYYY-MM-DD HH:mm",
+                help="날짜와 시간을 선택하세요"
+            ),
+            "공포포지션": st.column_config.SelectboxColumn(
+                "공포포지션",
+                options=["탱커", "평민", "쫄"],
+                required=True
+            ),
+        }
+    )
+
+    return edited_users_df
+
+
+@st.fragment
+def _scenarios_fragment(scenarios, summaries, csv_files):
+    """
+    Render scenario tabs and export controls.
+
+    Runs as a fragment so export interactions rerun only this section.
+    Summaries and CSV bytes are precomputed for each scenario at generation
+    time, so a rerun only re-emits the tab contents.
+    """
+    # Create tabs for each scenario
+    tab_names = [
+        f"{s.get('name', f'시나리오 {i+1}')}"
+        for i, s in enumerate(scenarios)
+    ]
+    tabs = st.tabs(tab_names)
+
+    for tab, scenario, scenario_text, csv_data in zip(tabs, scenarios, summaries, csv_files):
+        with tab:
+            # Display scenario
+            st.markdown(scenario_text)
+
+            # Export section
+            st.divider()
+            st.subheader("📤 내보내기")
+
+            # Google Sheets export with URL input
+            sheets_available = _sheets_configured()
+
+            if sheets_available:
+                st.markdown("**📊 Google Sheets로 내보내기**")
+                service_email = _service_account_email()
+
+                st.info(
+                    f"💡 **사용 방법:**\n"
+                    f"1. 본인 Google Sheets를 열고 '공유' 클릭\n"
+                    f"2. 다음 이메일 추가 (편집자 권한): `{service_email}`\n"
+                    f"3. 스프레드시트 URL을 아래에 붙여넣기\n"
+                    f"4. '시트에 탭 추가' 버튼 클릭\n\n"
+                    f"✨ Service Account 용량 제한 없음!"
+                )
+
+                spreadsheet_url = st.text_input(
+                    "스프레드시트 URL",
+                    key=f"spreadsheet_url_{scenario.get('scenario_id')}",
+                    placeholder="https://docs.google.com/spreadsheets/d/...",
+                    help="본인이 소유한 Google Sheets URL을 입력하세요"
+                )
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    if st.button(
+                        "📊 시트에 탭 추가",
+                        key=f"export_sheets_{scenario.get('scenario_id')}",
+                        disabled=not spreadsheet_url,
+                        use_container_width=True,
+                    ):
+                        with st.spinner("📊 시트 탭 추가 중..."):
+                            try:
+                                from src.sheets import get_exporter
+
+                                exporter = get_exporter()
+                                sheet_url = exporter.add_sheet_to_existing_spreadsheet(
+                                    spreadsheet_url, scenario
+                                )
+
+                                if sheet_url:
+                                    st.success("✅ 시트 탭 추가 완료!")
+                                    st.markdown(
+                                        f"[📊 시트 열기]({sheet_url})",
+                                        unsafe_allow_html=True,
+                                    )
+                                else:
+                                    st.error("시트 추가에 실패했습니다")
+
+                            except Exception as e:
+                                st.error(f"{str(e)}")
+
+                with col2:
+                    # CSV download button (moved inside col2)
+                    st.markdown("**📥 CSV 다운로드**")
+
+                    if csv_data:
+                        st.download_button(
+                            label="다운로드",
+                            data=csv_data,
+                            file_name=f"escape_room_schedule_{scenario.get('scenario_id', 1)}.csv",
+                            mime="text/csv",
+                            key=f"export_csv_{scenario.get('scenario_id')}",
+                            use_container_width=True,
+                        )
+            else:
+                st.warning("⚠️ Google Sheets API가 설정되지 않았습니다. (사이드바 참고)")
+
+                # CSV download only
+                st.markdown("**📥 CSV 다운로드**")
+
+                if csv_data:
+                    st.download_button(
+                        label="📥 CSV 다운로드",
+                        data=csv_data,
+                        file_name=f"escape_room_schedule_{scenario.get('scenario_id', 1)}.csv",
+                        mime="text/csv",
+                        key=f"export_csv_only_{scenario.get('scenario_id')}",
+                        use_container_width=True,
+                    )
 
 
 def main():
@@ -27,28 +433,32 @@ def main():
 
     # Validate configuration
     with st.sidebar:
-        st.header("⚙️ 설정")
-
-        missing_config = Config.validate()
-        if missing_config:
+        if MISSING_CONFIG:
+            st.header("⚙️ 설정")
             st.error("❌ API 키가 설정되지 않았습니다")
             st.markdown("다음 항목을 환경 변수로 설정해주세요:")
-            for item in missing_config:
+            for item in MISSING_CONFIG:
                 st.code(f"export {item}=...", language="bash")
             st.info(
                 "💡 Shell 설정 파일 (예: ~/.bashrc, ~/.zshrc)에 추가 후 `source` 명령으로 적용"
             )
             st.stop()
-        else:
+
+        # Static status grouped in one container; Google Sheets status included
+        sheets_configured = _sheets_configured()
+        with st.container():
+            st.header("⚙️ 설정")
             st.success("✅ API 키 설정 완료")
+            st.divider()
+            st.subheader("📊 Google Sheets")
+            if sheets_configured:
+                st.success("✅ 설정 완료")
+            else:
+                st.warning("⚠️ 미설정 (선택사항)")
+
+        if not sheets_configured:
+            from src.sheets import SheetsHelper
 
-        # Google Sheets status
-        st.divider()
-        st.subheader("📊 Google Sheets")
-        if Config.is_google_sheets_configured():
-            st.success("✅ 설정 완료")
-        else:
-            st.warning("⚠️ 미설정 (선택사항)")
             with st.expander("설정 방법 보기"):
                 st.markdown(SheetsHelper.get_setup_instructions())
 
@@ -67,15 +477,14 @@ def main():
         )
 
         # Download example
-        example_reservations = Path("data/example_reservations.csv")
-        if example_reservations.exists():
-            with open(example_reservations, "rb") as f:
-                st.download_button(
-                    "📥 예시 파일 다운로드",
-                    f,
-                    file_name="example_reservations.csv",
-                    mime="text/csv"
-                )
+        example_reservations = _example_bytes("data/example_reservations.csv")
+        if example_reservations:
+            st.download_button(
+                "📥 예시 파일 다운로드",
+                example_reservations,
+                file_name="example_reservations.csv",
+                mime="text/csv"
+            )
 
     with col2:
         st.subheader("참여자 정보")
@@ -87,25 +496,35 @@ def main():
         )
 
         # Download example
-        example_users = Path("data/example_users.csv")
-        if example_users.exists():
-            with open(example_users, "rb") as f:
-                st.download_button(
-                    "📥 예시 파일 다운로드",
-                    f,
-                    file_name="example_users.csv",
-                    mime="text/csv"
-                )
+        example_users = _example_bytes("data/example_users.csv")
+        if example_users:
+            st.download_button(
+                "📥 예시 파일 다운로드",
+                example_users,
+                file_name="example_users.csv",
+                mime="text/csv"
+            )
 
     # Parse uploaded files
     if reservations_file and users_file:
         try:
-            import pandas as pd
-
-            with st.spinner("📊 데이터 파싱 중..."):
-                # Parse to validate format
-                reservations = parse_reservations(reservations_file)
-                users = parse_users(users_file)
+            # Skip parsing entirely while the same uploads are in session state
+            file_sig = (reservations_file.file_id, users_file.file_id)
+            if st.session_state.get("_parsed_sig") != file_sig:
+                with st.spinner("📊 데이터 파싱 중..."):
+                    # Parse to validate format; models and frames are cached by content
+                    (
+                        st.session_state.reservations,
+                        st.session_state.reservations_df,
+                    ) = _cached_reservations(reservations_file.getvalue())
+                    (
+                        st.session_state.users,
+                        st.session_state.users_df,
+                    ) = _cached_users(users_file.getvalue())
+                st.session_state._parsed_sig = file_sig
+
+            reservations = st.session_state.reservations
+            users = st.session_state.users
 
             st.success(f"✅ 예약 {len(reservations)}건, 참여자 {len(users)}명 확인")
 
@@ -116,126 +535,36 @@ def main():
             tab1, tab2 = st.tabs(["예약 정보", "참여자 정보"])
 
             with tab1:
-                # Create editable DataFrame for reservations
-                reservations_df = pd.DataFrame([
-                    {
-                        "방이름": r.room_name,
-                        "시작시간": r.start_time,
-                        "종료시간": r.end_time,
-                        "주소": r.address,
-                        "테마": r.theme,
-                        "최소인원": r.min_capacity,
-                        "적정인원": r.optimal_capacity,
-                        "최대인원": r.max_capacity
-                    }
-                    for r in reservations
-                ])
-
-                edited_reservations_df = st.data_editor(
-                    reservations_df,
-                    num_rows="dynamic",  # Allow adding/removing rows
-                    use_container_width=True,
-                    key="reservations_editor",
-                    column_config={
-                        "방이름": st.column_config.TextColumn("방이름", required=True),
-                        "시작시간": st.column_config.DatetimeColumn(
-                            "시작시간",
-                            required=True,
-                            format="YYYY-MM-DD HH:mm",
-                            help="날짜와 시간을 선택하세요"
-                        ),
-                        "종료시간": st.column_config.DatetimeColumn(
-                            "종료시간",
-                            required=True,
-                            format="YYYY-MM-DD HH:mm",
-                            help="날짜와 시간을 선택하세요"
-                        ),
-                        "주소": st.column_config.TextColumn("주소", required=True),
-                        "테마": st.column_config.TextColumn("테마", required=True),
-                        "최소인원": st.column_config.NumberColumn("최소인원", min_value=1, max_value=20, required=True),
-                        "적정인원": st.column_config.NumberColumn("적정인원", min_value=1, max_value=20, required=True),
-                        "최대인원": st.column_config.NumberColumn("최대인원", min_value=1, max_value=20, required=True),
-                    }
-                )
-
-                # Store edited data in session state
-                st.session_state.edited_reservations_df = edited_reservations_df
+                edited_reservations_df = _reservations_editor(st.session_state.reservations_df)
 
             with tab2:
-                # Create editable DataFrame for users
-                users_df = pd.DataFrame([
-                    {
-                        "이름": u.name,
-                        "참여시작시간": u.available_from,
-                        "참여종료시간": u.available_until,
-                        "공포포지션": u.horror_position
-                    }
-                    for u in users
-                ])
-
-                edited_users_df = st.data_editor(
-                    users_df,
-                    num_rows="dynamic",  # Allow adding/removing rows
-                    use_container_width=True,
-                    key="users_editor",
-                    column_config={
-                        "이름": st.column_config.TextColumn("이름", required=True),
-                        "참여시작시간": st.column_config.DatetimeColumn(
-                            "참여시작시간",
-                            required=True,
-                            format="YYYY-MM-DD HH:mm",
-                            help="날짜와 시간을 선택하세요"
-                        ),
-                        "참여종료시간": st.column_config.DatetimeColumn(
-                            "참여종료시간",
-                            required=True,
-                            format="YYYY-MM-DD HH:mm",
-                            help="날짜와 시간을 선택하세요"
-                        ),
-                        "공포포지션": st.column_config.SelectboxColumn(
-                            "공포포지션",
-                            options=["탱커", "평민", "쫄"],
-                            required=True
-                        ),
-                    }
-                )
-
-                # Store edited data in session state
-                st.session_state.edited_users_df = edited_users_df
+                edited_users_df = _users_editor(st.session_state.users_df)
 
             # Generate schedule button
             st.header("🤖 3. 일정 생성")
 
+            # Generated scenarios are cached on disk for the same data
+            regenerate = st.checkbox(
+                "🔄 저장된 결과 대신 새로 생성",
+                help="같은 데이터로 이전에 생성한 시나리오를 재사용하지 않고 Claude에게 새로 요청합니다",
+            )
+
             if st.button("🚀 일정 생성하기", type="primary", use_container_width=True):
                 # Parse edited data from DataFrames
                 try:
-                    from io import StringIO
-
-                    # Convert datetime columns to string format for CSV parsing
-                    reservations_csv_df = edited_reservations_df.copy()
-                    if "시작시간" in reservations_csv_df.columns:
-                        reservations_csv_df["시작시간"] = pd.to_datetime(reservations_csv_df["시작시간"]).dt.strftime("%Y-%m-%d %H:%M")
-                    if "종료시간" in reservations_csv_df.columns:
-                        reservations_csv_df["종료시간"] = pd.to_datetime(reservations_csv_df["종료시간"]).dt.strftime("%Y-%m-%d %H:%M")
-
-                    users_csv_df = edited_users_df.copy()
-                    if "참여시작시간" in users_csv_df.columns:
-                        users_csv_df["참여시작시간"] = pd.to_datetime(users_csv_df["참여시작시간"]).dt.strftime("%Y-%m-%d %H:%M")
-                    if "참여종료시간" in users_csv_df.columns:
-                        users_csv_df["참여종료시간"] = pd.to_datetime(users_csv_df["참여종료시간"]).dt.strftime("%Y-%m-%d %H:%M")
-
-                    # Convert edited DataFrames back to CSV format for parsing
-                    reservations_csv = StringIO()
-                    reservations_csv_df.to_csv(reservations_csv, index=False)
-                    reservations_csv.seek(0)
-
-                    users_csv = StringIO()
-                    users_csv_df.to_csv(users_csv, index=False)
-                    users_csv.seek(0)
-
-                    # Parse edited data
-                    edited_reservations = parse_reservations(reservations_csv)
-                    edited_users = parse_users(users_csv)
+                    # Reuse the upload's parse result for untouched tables;
+                    # otherwise build models straight from the edited rows
+                    if _editor_unchanged("reservations_editor"):
+                        edited_reservations = reservations
+                    else:
+                        edited_reservations = parse_reservations_frame(
+                            edited_reservations_df
+                        )
+
+                    if _editor_unchanged("users_editor"):
+                        edited_users = users
+                    else:
+                        edited_users = parse_users_frame(edited_users_df)
 
                     # Store data in session state for generation
                     st.session_state.parsed_reservations_data = edited_reservations
@@ -258,8 +587,8 @@ def main():
     if st.session_state.get("should_generate_schedule", False):
         st.session_state.should_generate_schedule = False  # Reset flag
 
-        reservations = st.session_state.get("parsed_reservations_data", [])
-        users = st.session_state.get("parsed_users_data", [])
+        reservations = st.session_state.get("parsed_reservations_data", _EMPTY)
+        users = st.session_state.get("parsed_users_data", _EMPTY)
 
         if not reservations or not users:
             st.error("데이터를 먼저 업로드해주세요")
@@ -276,10 +605,10 @@ def main():
                 progress_bar.progress(10)
 
                 try:
-                    travel_client = NaverMapsClient()
-                    addresses = list(set([r.address for r in reservations]))
+                    addresses = sorted({r.address for r in reservations})
 
-                    # Progress callback for travel time calculation
+                    # Progress callback for travel time calculation, already
+                    # throttled by the travel client
                     def update_progress(current, total):
                         progress = 10 + int((current / total) * 40)
                         progress_bar.progress(progress)
@@ -287,8 +616,8 @@ def main():
                             f"🗺️ 이동 시간 계산 중... ({current}/{total})"
                         )
 
-                    travel_matrix = travel_client.get_travel_time_matrix(
-                        addresses, progress_callback=update_progress
+                    travel_matrix = cached_travel_matrix(
+                        tuple(addresses), progress_callback=update_progress
                     )
 
                     progress_bar.progress(50)
@@ -306,15 +635,73 @@ def main():
                 progress_bar.progress(60)
 
                 try:
-                    claude = ClaudeScheduler()
-                    scenarios = claude.generate_scenarios(
-                        reservations, users, travel_matrix, num_scenarios=3
+                    from src.claude_agent import ScenarioDisplay
+
+                    # Progress callbacks for concurrent, streamed scenario generation
+                    received_chars = {}
+                    num_scenarios = 3
+                    # (completed, total) as last reported by the generator
+                    scenario_progress = [0, num_scenarios]
+                    summaries = {}
+
+                    # Finished scenarios are previewed here until all are done
+                    preview = st.empty()
+                    preview_container = preview.container()
+
+                    def show_scenario_status():
+                        streamed = " · ".join(
+                            f"시나리오 {scenario_id}: {chars:,}자"
+                            for scenario_id, chars in sorted(received_chars.items())
+                        )
+                        status_text.text(
+                            f"🤖 Claude AI가 최적 시나리오를 생성하고 있습니다... "
+                            f"({scenario_progress[0]}/{scenario_progress[1]} 완료) {streamed}"
+                        )
+
+                    def update_scenario_progress(current, total):
+                        scenario_progress[:] = [current, total]
+                        progress_bar.progress(60 + int((current / total) * 40))
+                        show_scenario_status()
+
+                    throttled_scenario_status = _throttled(show_scenario_status)
+
+                    def update_stream_progress(scenario_id, chars):
+                        received_chars[scenario_id] = chars
+                        throttled_scenario_status()
+
+                    def show_scenario(scenario):
+                        summary = ScenarioDisplay.format_scenario_summary(scenario)
+                        summaries[scenario["scenario_id"]] = summary
+                        preview_container.expander(
+                            f"✅ {scenario.get('name', '시나리오')}"
+                        ).markdown(summary)
+
+                    scenarios = get_claude().generate_scenarios(
+                        reservations,
+                        users,
+                        travel_matrix,
+                        num_scenarios=num_scenarios,
+                        progress_callback=update_scenario_progress,
+                        stream_callback=update_stream_progress,
+                        scenario_callback=show_scenario,
+                        use_cache=not regenerate,
                     )
+                    preview.empty()
                     progress_bar.progress(100)
                     status_text.text(f"✅ {len(scenarios)}개 시나리오 생성 완료")
 
                     # Store scenarios in session state to persist across reruns
                     st.session_state.generated_scenarios = scenarios
+                    # Format here any scenario the callback did not summarize
+                    st.session_state.generated_scenarios_md = [
+                        summaries.get(s.get("scenario_id"))
+                        or ScenarioDisplay.format_scenario_summary(s)
+                        for s in scenarios
+                    ]
+                    st.session_state.generated_scenarios_csv = [
+                        _scenario_to_csv_bytes(s) for s in scenarios
+                    ]
+                    st.session_state.travel_matrix = travel_matrix
 
                 except Exception as e:
                     st.error(f"❌ 시나리오 생성 실패: {str(e)}")
@@ -324,10 +711,11 @@ def main():
                     raise
 
             except Exception as e:
+                logger.error("Schedule generation failed", exc_info=True)
                 st.error(f"❌ 일정 생성 오류: {str(e)}")
-                import traceback
-
-                st.code(traceback.format_exc())
+                if Config.DEBUG:
+                    with st.expander("상세 오류 보기"):
+                        st.exception(e)
 
     # Display scenarios if they exist in session state
     if st.session_state.get("generated_scenarios"):
@@ -341,155 +729,17 @@ def main():
             st.write("")  # Spacing
             if st.button("🗑️ 일정 초기화", use_container_width=True, help="생성된 일정을 삭제하고 처음부터 다시 시작합니다"):
                 st.session_state.generated_scenarios = None
+                st.session_state.generated_scenarios_md = None
+                st.session_state.generated_scenarios_csv = None
+                st.session_state.travel_matrix = None
                 st.rerun()
 
         if scenarios:
-                    # Create tabs for each scenario
-                    tab_names = [
-                        f"{s.get('name', f'시나리오 {i+1}')}"
-                        for i, s in enumerate(scenarios)
-                    ]
-                    tabs = st.tabs(tab_names)
-
-                    for tab, scenario in zip(tabs, scenarios):
-                        with tab:
-                            # Display scenario
-                            scenario_text = ScenarioDisplay.format_scenario_summary(
-                                scenario
-                            )
-                            st.markdown(scenario_text)
-
-                            # Export section
-                            st.divider()
-                            st.subheader("📤 내보내기")
-
-                            # Google Sheets export with URL input
-                            sheets_available = Config.is_google_sheets_configured()
-
-                            if sheets_available:
-                                st.markdown("**📊 Google Sheets로 내보내기**")
-                                # Get Service Account email
-                                try:
-                                    from src.sheets import GoogleSheetsExporter
-                                    exporter_temp = GoogleSheetsExporter()
-                                    if exporter_temp.enabled:
-                                        service_email = exporter_temp.client.auth.service_account_email
-                                    else:
-                                        service_email = "N/A"
-                                except:
-                                    service_email = "N/A"
-
-                                st.info(
-                                    f"💡 **사용 방법:**\n"
-                                    f"1. 본인 Google Sheets를 열고 '공유' 클릭\n"
-                                    f"2. 다음 이메일 추가 (편집자 권한): `{service_email}`\n"
-                                    f"3. 스프레드시트 URL을 아래에 붙여넣기\n"
-                                    f"4. '시트에 탭 추가' 버튼 클릭\n\n"
-                                    f"✨ Service Account 용량 제한 없음!"
-                                )
-
-                                spreadsheet_url = st.text_input(
-                                    "스프레드시트 URL",
-                                    key=f"spreadsheet_url_{scenario.get('scenario_id')}",
-                                    placeholder="https://docs.google.com/spreadsheets/d/...",
-                                    help="본인이 소유한 Google Sheets URL을 입력하세요"
-                                )
-
-                                col1, col2 = st.columns(2)
-
-                                with col1:
-                                    if st.button(
-                                        "📊 시트에 탭 추가",
-                                        key=f"export_sheets_{scenario.get('scenario_id')}",
-                                        disabled=not spreadsheet_url,
-                                        use_container_width=True,
-                                    ):
-                                        with st.spinner("📊 시트 탭 추가 중..."):
-                                            try:
-                                                exporter = GoogleSheetsExporter()
-                                                sheet_url = exporter.add_sheet_to_existing_spreadsheet(
-                                                    spreadsheet_url, scenario
-                                                )
-
-                                                if sheet_url:
-                                                    st.success("✅ 시트 탭 추가 완료!")
-                                                    st.markdown(
-                                                        f"[📊 시트 열기]({sheet_url})",
-                                                        unsafe_allow_html=True,
-                                                    )
-                                                else:
-                                                    st.error("시트 추가에 실패했습니다")
-
-                                            except Exception as e:
-                                                st.error(f"{str(e)}")
-
-                                with col2:
-                                    # CSV download button (moved inside col2)
-                                    st.markdown("**📥 CSV 다운로드**")
-                                    import pandas as pd
-
-                                    # Convert scenario to CSV format
-                                    rows = []
-                                    for team_id, assignments in scenario.get("teams", {}).items():
-                                        for assignment in assignments:
-                                            rows.append({
-                                                "팀": f"팀 {team_id}",
-                                                "시작시간": assignment.get("start_time", ""),
-                                                "종료시간": assignment.get("end_time", ""),
-                                                "방이름": assignment.get("room_name", ""),
-                                                "테마": assignment.get("theme", ""),
-                                                "참여자": ", ".join(assignment.get("members", [])),
-                                                "인원": assignment.get("member_count", 0),
-                                                "이동시간(분)": assignment.get("travel_time_from_previous", 0),
-                                                "메모": assignment.get("notes", "")
-                                            })
-
-                                    if rows:
-                                        csv_df = pd.DataFrame(rows)
-                                        csv_data = csv_df.to_csv(index=False, encoding="utf-8-sig")
-
-                                        st.download_button(
-                                            label="다운로드",
-                                            data=csv_data,
-                                            file_name=f"escape_room_schedule_{scenario.get('scenario_id', 1)}.csv",
-                                            mime="text/csv",
-                                            key=f"export_csv_{scenario.get('scenario_id')}",
-                                            use_container_width=True,
-                                        )
-                            else:
-                                st.warning("⚠️ Google Sheets API가 설정되지 않았습니다. (사이드바 참고)")
-
-                                # CSV download only
-                                st.markdown("**📥 CSV 다운로드**")
-                                import pandas as pd
-
-                                rows = []
-                                for team_id, assignments in scenario.get("teams", {}).items():
-                                    for assignment in assignments:
-                                        rows.append({
-                                            "팀": f"팀 {team_id}",
-                                            "시작시간": assignment.get("start_time", ""),
-                                            "종료시간": assignment.get("end_time", ""),
-                                            "방이름": assignment.get("room_name", ""),
-                                            "테마": assignment.get("theme", ""),
-                                            "참여자": ", ".join(assignment.get("members", [])),
-                                            "인원": assignment.get("member_count", 0),
-                                            "이동시간(분)": assignment.get("travel_time_from_previous", 0),
-                                            "메모": assignment.get("notes", "")
-                                        })
-
-                                if rows:
-                                    csv_df = pd.DataFrame(rows)
-                                    csv_data = csv_df.to_csv(index=False, encoding="utf-8-sig")
-
-                                    st.download_button(
-                                        label="📥 CSV 다운로드",
-                                        data=csv_data,
-                                        file_name=f"escape_room_schedule_{scenario.get('scenario_id', 1)}.csv",
-                                        mime="text/csv",
-                                        key=f"export_csv_only_{scenario.get('scenario_id')}",
-                                        use_container_width=True,
-                                    )
+            _scenarios_fragment(
+                scenarios,
+                st.session_state.generated_scenarios_md,
+                st.session_state.generated_scenarios_csv,
+            )
         else:
             st.info("일정을 생성하면 여기에 시나리오가 표시됩니다.")
 
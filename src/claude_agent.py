@@ -1,24 +1,126 @@
 """
 Claude API integration for schedule generation.
 """
+import asyncio
+import hashlib
 import json
+import logging
+import random
+import re
 import time
-from typing import List, Dict, Any
-from anthropic import Anthropic
+from functools import lru_cache
+from pathlib import Path
+import orjson
+from typing import List, Dict, Any, Optional, Tuple
+from anthropic import APIConnectionError, APIStatusError, AsyncAnthropic, RateLimitError
 from config import Config
 from src.models import Reservation, User, Schedule
 from src.scheduler import ScheduleFormatter
 
+logger = logging.getLogger(__name__)
+
+# Code fence contents, up to the closing fence or the end of the text
+_JSON_FENCE_RE = re.compile(r"```json(.*?)(?:```|\Z)", re.DOTALL)
+_FENCE_RE = re.compile(r"```(.*?)(?:```|\Z)", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+# Optimization focus for each scenario, generated as separate requests
+SCENARIO_FOCUSES = [
+    ("팀 균형 우선", "팀 균형 최우선"),
+    ("이동 최소화", "이동 거리/시간 최소화"),
+    ("식사 여유 확보", "식사 시간 여유 확보"),
+]
+
+# Role, constraints, goals and output schema; identical for every request,
+# so it is built once and sent as a cached system prompt
+SYSTEM_PROMPT = f"""당신은 방탈출 모임을 위한 일정 생성 전문가입니다.
+
+사용자가 제공하는 예약 정보와 참여자 정보를 바탕으로 최적의 스케줄 시나리오 1가지를 생성해주세요.
+
+{ScheduleFormatter.format_constraints_for_claude()}
+
+목표:
+1. **팀 균등 분배 (최우선)**: 모든 팀이 비슷한 수의 방탈출을 경험하도록
+2. **테마 다양성**: 한 팀이 같은 테마만 하지 않도록
+3. **공포 포지션 고려**: 공포 테마는 탱커 분산 배치
+4. **식사 시간 확보**: 점심/저녁 시간대 고려
+5. **이동 효율성**: 불필요한 이동 최소화
+
+반드시 다음 JSON 형식으로 응답해주세요 (scenario_id와 name은 요청에 주어진 값을 사용):
+
+```json
+{{
+  "scenario_id": 1,
+  "name": "시나리오 이름",
+  "description": "이 시나리오의 최적화 방향 설명",
+  "teams": {{
+    "1": [
+      {{
+        "room_name": "방이름",
+        "start_time": "14:00",
+        "end_time": "16:00",
+        "address": "주소",
+        "theme": "테마",
+        "members": ["참여자1", "참여자2"],
+        "member_count": 2,
+        "travel_time_from_previous": 0,
+        "notes": "특이사항 (예: 점심시간, 공포테마 등)"
+      }}
+    ],
+    "2": [...]
+  }},
+  "pros": "장점 설명",
+  "cons": "단점 설명"
+}}
+```
+
+JSON만 출력하고 다른 설명은 포함하지 마세요."""
+
+_SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+]
+
+
+@lru_cache(maxsize=8)
+def _format_prompt_sections(
+    reservations: Tuple[Reservation, ...],
+    users: Tuple[User, ...],
+    travel_items: Tuple[Tuple[tuple, int], ...],
+) -> str:
+    """
+    Format the input data for the prompt, memoized on the (hashable, frozen) inputs.
+
+    Regenerating without edits passes equal data again, so the formatted
+    text is reused instead of rebuilt.
+
+    Returns:
+        Reservations, users and travel times text
+    """
+    return "\n\n".join((
+        ScheduleFormatter.format_reservations_for_claude(list(reservations)),
+        ScheduleFormatter.format_users_for_claude(list(users)),
+        ScheduleFormatter.format_travel_times_for_claude(dict(travel_items)),
+    ))
+
 
 class ClaudeScheduler:
     """Use Claude API to generate optimized schedules."""
 
+    MODEL = "claude-opus-4-5-20251101"
+    MAX_CONCURRENT_REQUESTS = 5
+    # One scenario per request stays well under this
+    MAX_TOKENS = 4000
+
+    # On-disk cache of generated scenarios, keyed by a hash of the inputs
+    CACHE_DIR = Path(".claude_cache")
+    CACHE_TTL = 24 * 60 * 60  # seconds
+
     def __init__(self):
-        """Initialize Claude client."""
+        """Initialize Claude client settings."""
         if not Config.ANTHROPIC_API_KEY:
             raise ValueError("ANTHROPIC_API_KEY is not set")
 
-        self.client = Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+        self.api_key = Config.ANTHROPIC_API_KEY
 
     def generate_scenarios(
         self,
@@ -26,142 +128,280 @@ class ClaudeScheduler:
         users: List[User],
         travel_matrix: Dict[tuple, int],
         num_scenarios: int = 3,
+        progress_callback=None,
+        stream_callback=None,
+        scenario_callback=None,
+        use_cache: bool = True,
     ) -> List[Dict[str, Any]]:
         """
         Generate multiple schedule scenarios using Claude.
 
+        Runs generate_scenarios_async on a fresh event loop, so scenarios
+        are requested concurrently.
+
         Args:
             reservations: List of escape room reservations
             users: List of participants
             travel_matrix: Travel time matrix between addresses
             num_scenarios: Number of different scenarios to generate
+            progress_callback: Optional callback function(current, total) for progress updates
+            stream_callback: Optional callback function(scenario_id, received_chars) per streamed chunk
+            scenario_callback: Optional callback function(scenario) as each scenario is ready
+            use_cache: Reuse scenarios cached for the same prompts; False always asks Claude
 
         Returns:
             List of scenario dictionaries
         """
+        return asyncio.run(
+            self.generate_scenarios_async(
+                reservations,
+                users,
+                travel_matrix,
+                num_scenarios=num_scenarios,
+                progress_callback=progress_callback,
+                stream_callback=stream_callback,
+                scenario_callback=scenario_callback,
+                use_cache=use_cache,
+            )
+        )
+
+    async def generate_scenarios_async(
+        self,
+        reservations: List[Reservation],
+        users: List[User],
+        travel_matrix: Dict[tuple, int],
+        num_scenarios: int = 3,
+        progress_callback=None,
+        stream_callback=None,
+        scenario_callback=None,
+        use_cache: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate scenarios with one concurrent Claude request per scenario.
+
+        Complete results are cached on disk for CACHE_TTL, keyed by the
+        exact requests, so generating again with the same data reuses them.
+
+        Args:
+            reservations: List of escape room reservations
+            users: List of participants
+            travel_matrix: Travel time matrix between addresses
+            num_scenarios: Number of different scenarios to generate
+            progress_callback: Optional callback function(current, total) for progress updates
+            stream_callback: Optional callback function(scenario_id, received_chars) per streamed chunk
+            scenario_callback: Optional callback function(scenario) as each scenario is ready
+            use_cache: Reuse scenarios cached for the same prompts; False always asks Claude
+
+        Returns:
+            List of scenario dictionaries, in scenario order
+        """
         # Format data for Claude
-        reservations_text = ScheduleFormatter.format_reservations_for_claude(
-            reservations
+        data_text = _format_prompt_sections(
+            tuple(reservations), tuple(users), tuple(sorted(travel_matrix.items()))
         )
-        users_text = ScheduleFormatter.format_users_for_claude(users)
-        travel_text = ScheduleFormatter.format_travel_times_for_claude(travel_matrix)
-        constraints_text = ScheduleFormatter.format_constraints_for_claude()
+        contents = [
+            self._build_prompt(data_text, scenario_id)
+            for scenario_id in range(1, num_scenarios + 1)
+        ]
+
+        cache_key = self._cache_key(contents)
+        cached = self._load_cached(cache_key) if use_cache else None
+        if cached is not None:
+            for scenario in cached:
+                if scenario_callback:
+                    scenario_callback(scenario)
+            if progress_callback:
+                progress_callback(num_scenarios, num_scenarios)
+            return cached
+
+        completed = 0
+        # Stay under the API rate limit when many scenarios are requested
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        # The async client is bound to this event loop, so it is not reused
+        async with AsyncAnthropic(api_key=self.api_key) as client:
+
+            async def generate_one(scenario_id: int) -> Dict[str, Any]:
+                nonlocal completed
+                async with semaphore:
+                    scenario = await self._request_scenario(
+                        client,
+                        contents[scenario_id - 1],
+                        scenario_id,
+                        stream_callback=stream_callback,
+                    )
+
+                completed += 1
+                if scenario_callback:
+                    scenario_callback(scenario)
+                if progress_callback:
+                    progress_callback(completed, num_scenarios)
+                return scenario
+
+            results = await asyncio.gather(
+                *(generate_one(i) for i in range(1, num_scenarios + 1)),
+                return_exceptions=True,
+            )
+
+        scenarios = [r for r in results if not isinstance(r, BaseException)]
+        if not scenarios:
+            raise results[0]
+
+        failed = len(results) - len(scenarios)
+        if failed:
+            logger.warning("%s/%s scenarios failed to generate", failed, num_scenarios)
+        else:
+            self._store_cached(cache_key, scenarios)
+
+        return scenarios
+
+    def _cache_key(self, contents: List[List[Dict[str, Any]]]) -> str:
+        """
+        Hash the canonical JSON of every request for a generation.
 
-        # Build prompt
-        prompt = self._build_prompt(
-            reservations_text, users_text, travel_text, constraints_text, num_scenarios
+        Covers the model, token limit, system prompt and each scenario's
+        user message, so any prompt change yields a new key.
+        """
+        payload = orjson.dumps(
+            {
+                "model": self.MODEL,
+                "max_tokens": self.MAX_TOKENS,
+                "system": _SYSTEM_BLOCKS,
+                "messages": contents,
+            },
+            option=orjson.OPT_SORT_KEYS,
         )
+        return hashlib.sha256(payload).hexdigest()
 
-        # Call Claude API with retry logic
+    def _load_cached(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return cached scenarios for key, or None if missing or expired."""
+        path = self.CACHE_DIR / f"{key}.json"
+        try:
+            if time.time() - path.stat().st_mtime > self.CACHE_TTL:
+                path.unlink(missing_ok=True)
+                return None
+            return orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def _prune_cache(self) -> None:
+        """Delete cache files older than CACHE_TTL."""
+        cutoff = time.time() - self.CACHE_TTL
+        for path in self.CACHE_DIR.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass  # Removed concurrently
+
+    def _store_cached(self, key: str, scenarios: List[Dict[str, Any]]) -> None:
+        """Write scenarios to the cache; failures only skip caching."""
+        path = self.CACHE_DIR / f"{key}.json"
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent readers never see a partial file
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(orjson.dumps(scenarios))
+            tmp_path.replace(path)
+            self._prune_cache()
+        except OSError as e:
+            logger.warning("Failed to cache scenarios: %s", e)
+
+    async def _request_scenario(
+        self,
+        client: AsyncAnthropic,
+        content: List[Dict[str, Any]],
+        scenario_id: int,
+        stream_callback=None,
+    ) -> Dict[str, Any]:
+        """Stream a single scenario from Claude, retrying on failure."""
         max_retries = 3
         retry_delay = 2  # seconds
 
         for attempt in range(max_retries):
             try:
-                response = self.client.messages.create(
-                    model="claude-opus-4-5-20251101",
-                    max_tokens=8000,
-                    messages=[{"role": "user", "content": prompt}],
+                # Stream the response so callers can report progress early
+                chunks = []
+                received = 0
+                async with client.messages.stream(
+                    model=self.MODEL,
+                    max_tokens=self.MAX_TOKENS,
+                    system=_SYSTEM_BLOCKS,
+                    messages=[{"role": "user", "content": content}],
+                ) as stream:
+                    async for text in stream.text_stream:
+                        chunks.append(text)
+                        received += len(text)
+                        if stream_callback:
+                            stream_callback(scenario_id, received)
+                    usage = (await stream.get_final_message()).usage
+
+                logger.info(
+                    "Scenario %s prompt cache: %s tokens read, %s tokens written",
+                    scenario_id,
+                    getattr(usage, "cache_read_input_tokens", None),
+                    getattr(usage, "cache_creation_input_tokens", None),
                 )
 
-                # Parse response
-                # Get text from first content block
-                first_block = response.content[0]
-                if hasattr(first_block, "text"):
-                    response_text = first_block.text
-                else:
+                response_text = "".join(chunks)
+                if not response_text:
                     raise ValueError("Unexpected response format from Claude")
 
                 # Extract JSON from response
                 scenarios = self._parse_scenarios(response_text)
 
                 if scenarios:
-                    return scenarios
+                    scenario = scenarios[0]
+                    # Keep ids unique across concurrent requests
+                    scenario["scenario_id"] = scenario_id
+                    return scenario
                 else:
-                    print("⚠️ Claude response text:")
-                    print(response_text[:1000])  # First 1000 chars for debugging
+                    logger.debug("Claude response without scenarios: %s", response_text)
                     raise ValueError("No scenarios returned from Claude")
 
-            except Exception as e:
+            except (APIConnectionError, APIStatusError) as e:
+                # Client errors (bad request, auth) will not succeed on retry
+                if isinstance(e, APIStatusError) and e.status_code < 500 and not isinstance(
+                    e, RateLimitError
+                ):
+                    logger.warning("Claude API error (scenario %s): %s", scenario_id, e)
+                    raise
                 if attempt < max_retries - 1:
-                    print(
-                        f"Claude API error (attempt {attempt + 1}/{max_retries}): {str(e)}"
+                    logger.warning(
+                        "Claude API error (scenario %s, attempt %s/%s): %s",
+                        scenario_id,
+                        attempt + 1,
+                        max_retries,
+                        e,
                     )
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
+                    # Exponential backoff with jitter, so concurrent requests spread out
+                    await asyncio.sleep(retry_delay * 2**attempt * (0.5 + random.random()))
                 else:
-                    print(f"Claude API error (final attempt): {str(e)}")
+                    logger.warning("Claude API error (scenario %s, final attempt): %s", scenario_id, e)
                     raise
 
         # Should never reach here due to raise in except block
-        return []
-
-    def _build_prompt(
-        self,
-        reservations_text: str,
-        users_text: str,
-        travel_text: str,
-        constraints_text: str,
-        num_scenarios: int,
-    ) -> str:
-        """Build the prompt for Claude."""
-        return f"""당신은 방탈출 모임을 위한 일정 생성 전문가입니다.
-
-주어진 예약 정보와 참여자 정보를 바탕으로 {num_scenarios}가지 최적의 스케줄 시나리오를 생성해주세요.
+        raise ValueError("No scenarios returned from Claude")
 
-{reservations_text}
-
-{users_text}
-
-{travel_text}
-
-{constraints_text}
-
-목표:
-1. **팀 균등 분배 (최우선)**: 모든 팀이 비슷한 수의 방탈출을 경험하도록
-2. **테마 다양성**: 한 팀이 같은 테마만 하지 않도록
-3. **공포 포지션 고려**: 공포 테마는 탱커 분산 배치
-4. **식사 시간 확보**: 점심/저녁 시간대 고려
-5. **이동 효율성**: 불필요한 이동 최소화
-
-각 시나리오는 다른 최적화 목표를 강조해야 합니다:
-- 시나리오 1: 팀 균형 최우선
-- 시나리오 2: 이동 거리/시간 최소화
-- 시나리오 3: 식사 시간 여유 확보
-
-반드시 다음 JSON 형식으로 응답해주세요:
-
-```json
-{{
-  "scenarios": [
-    {{
-      "scenario_id": 1,
-      "name": "팀 균형 우선",
-      "description": "모든 팀이 동일한 수의 방탈출을 경험하도록 최적화",
-      "teams": {{
-        "1": [
-          {{
-            "room_name": "방이름",
-            "start_time": "14:00",
-            "end_time": "16:00",
-            "address": "주소",
-            "theme": "테마",
-            "members": ["참여자1", "참여자2"],
-            "member_count": 2,
-            "travel_time_from_previous": 0,
-            "notes": "특이사항 (예: 점심시간, 공포테마 등)"
-          }}
-        ],
-        "2": [...]
-      }},
-      "pros": "장점 설명",
-      "cons": "단점 설명"
-    }}
-  ]
-}}
-```
+    def _build_prompt(self, data_text: str, scenario_id: int) -> List[Dict[str, Any]]:
+        """
+        Build the user message content for a single scenario.
 
-JSON만 출력하고 다른 설명은 포함하지 마세요."""
+        The input data block is marked for caching, so the concurrent
+        scenario requests, retries and regenerations share one cached
+        prefix; only the short scenario block differs between them.
+        """
+        name, focus = SCENARIO_FOCUSES[(scenario_id - 1) % len(SCENARIO_FOCUSES)]
+        return [
+            {"type": "text", "text": data_text, "cache_control": {"type": "ephemeral"}},
+            {
+                "type": "text",
+                "text": f"""시나리오 번호: {scenario_id}
+시나리오 이름: {name}
+
+이 시나리오는 다음 최적화 목표를 강조해야 합니다: {focus}""",
+            },
+        ]
 
     def _parse_scenarios(self, response_text: str) -> List[Dict[str, Any]]:
         """
@@ -176,19 +416,31 @@ JSON만 출력하고 다른 설명은 포함하지 마세요."""
         # Find JSON in response (between ``` markers or directly)
         text = response_text.strip()
 
-        # Remove markdown code blocks if present
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
+        # Remove markdown code blocks if present, preferring a ```json block
+        match = _JSON_FENCE_RE.search(text) or _FENCE_RE.search(text)
+        if match:
+            text = match.group(1).strip()
 
         try:
-            data = json.loads(text)
-            return data.get("scenarios", [])
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {str(e)}")
-            print(f"Response text: {text}")
-            raise ValueError("Failed to parse Claude's response as JSON")
+            data = orjson.loads(text)
+        except orjson.JSONDecodeError as e:
+            # Fall back to the first JSON object, ignoring text around it
+            start = text.find("{")
+            try:
+                if start < 0:
+                    raise e
+                data, _ = _JSON_DECODER.raw_decode(text, start)
+            except ValueError as e:
+                logger.warning("JSON parsing error: %s", e)
+                logger.debug("Response text: %s", text)
+                raise ValueError("Failed to parse Claude's response as JSON")
+
+        if not isinstance(data, dict):
+            return []
+        # A single scenario object, or the older {"scenarios": [...]} wrapper
+        if "scenarios" in data:
+            return data["scenarios"]
+        return [data] if "teams" in data else []
 
 
 class ScenarioDisplay:
@@ -215,42 +467,43 @@ class ScenarioDisplay:
             lines.append("⚠️ 팀 정보가 없습니다.")
             return "\n".join(lines)
 
+        append = lines.append
         for team_id, assignments in teams.items():
-            lines.append(f"### 🎯 팀 {team_id}")
+            append(f"### 🎯 팀 {team_id}")
 
             if not assignments:
-                lines.append("   - 배정된 일정 없음\n")
+                append("   - 배정된 일정 없음\n")
                 continue
 
             for i, assignment in enumerate(assignments, 1):
-                # Safely get values with defaults
-                start_time = assignment.get("start_time", "시간 미정")
-                end_time = assignment.get("end_time", "시간 미정")
-                room_name = assignment.get("room_name", "방 이름 없음")
-                theme = assignment.get("theme", "테마 없음")
-                members = assignment.get("members", [])
-                member_count = assignment.get("member_count", len(members))
-
-                time_str = f"{start_time}-{end_time}"
+                # Safely get values with defaults, one bound lookup per field
+                get = assignment.get
+                start_time = get("start_time", "시간 미정")
+                end_time = get("end_time", "시간 미정")
+                room_name = get("room_name", "방 이름 없음")
+                theme = get("theme", "테마 없음")
+                members = get("members", ())
+                member_count = get("member_count", len(members))
+                travel_time = get("travel_time_from_previous", 0)
+                notes = get("notes", "")
+
                 members_str = ", ".join(members) if members else "참여자 없음"
 
                 # Theme emoji
                 theme_emoji = "🔪" if "공포" in theme else "🧩"
 
-                lines.append(
-                    f"**{i}. {time_str}** {theme_emoji} **{room_name}** ({theme})"
+                append(
+                    f"**{i}. {start_time}-{end_time}** {theme_emoji} **{room_name}** ({theme})"
                 )
-                lines.append(f"   - 👥 참여자 ({member_count}명): {members_str}")
+                append(f"   - 👥 참여자 ({member_count}명): {members_str}")
 
-                travel_time = assignment.get("travel_time_from_previous", 0)
                 if travel_time > 0:
-                    lines.append(f"   - 🚗 이동 시간: {travel_time}분")
+                    append(f"   - 🚗 이동 시간: {travel_time}분")
 
-                notes = assignment.get("notes", "")
                 if notes:
-                    lines.append(f"   - 📝 {notes}")
+                    append(f"   - 📝 {notes}")
 
-                lines.append("")
+                append("")
 
         # Pros and cons
         lines.append("---")
@@ -3,11 +3,16 @@ Data models for escape room scheduling.
 """
 from datetime import datetime
 from typing import Literal
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+
+
+def _minutes(dt: datetime) -> int:
+    """Whole minutes since 0001-01-01, ignoring seconds and timezone."""
+    return dt.toordinal() * 1440 + dt.hour * 60 + dt.minute
 
 
 class Reservation(BaseModel):
-    """Model for an escape room reservation."""
+    """Model for an escape room reservation (immutable and hashable)."""
 
     room_name: str = Field(alias="방이름")
     start_time: datetime = Field(alias="시작시간")
@@ -18,6 +23,11 @@ class Reservation(BaseModel):
     optimal_capacity: int = Field(alias="적정인원")
     max_capacity: int = Field(alias="최대인원")
 
+    # Derived once at construction
+    _is_horror: bool = PrivateAttr(default=False)
+    _start_minute: int = PrivateAttr(default=0)
+    _end_minute: int = PrivateAttr(default=0)
+
     @field_validator("start_time", "end_time", mode="before")
     @classmethod
     def parse_datetime(cls, value):
@@ -34,12 +44,44 @@ class Reservation(BaseModel):
             raise ValueError("Capacity must be positive")
         return value
 
+    def model_post_init(self, __context) -> None:
+        """Precompute derived attributes."""
+        self._is_horror = "공포" in self.theme
+        self._start_minute = _minutes(self.start_time)
+        self._end_minute = _minutes(self.end_time)
+
+    @property
+    def is_horror(self) -> bool:
+        """Whether this is a horror theme."""
+        return self._is_horror
+
+    @property
+    def start_minute(self) -> int:
+        """Start time as whole minutes on a fixed scale, for integer comparisons."""
+        return self._start_minute
+
+    @property
+    def end_minute(self) -> int:
+        """End time as whole minutes on a fixed scale, for integer comparisons."""
+        return self._end_minute
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Reservation":
+        """
+        Build a reservation from values in CSV column order.
+
+        Args:
+            row: (방이름, 시작시간, 종료시간, 주소, 테마, 최소인원, 적정인원, 최대인원), e.g. from DataFrame.itertuples
+        """
+        return cls(**dict(zip(_ALIASES[cls], row)))
+
     class Config:
         populate_by_name = True
+        frozen = True
 
 
 class User(BaseModel):
-    """Model for a user/participant."""
+    """Model for a user/participant (immutable and hashable)."""
 
     name: str = Field(alias="이름")
     available_from: datetime = Field(alias="참여시작시간")
@@ -63,8 +105,26 @@ class User(BaseModel):
             raise ValueError(f"공포포지션은 {', '.join(valid_positions)} 중 하나여야 합니다")
         return value
 
+    @classmethod
+    def from_row(cls, row: tuple) -> "User":
+        """
+        Build a user from values in CSV column order.
+
+        Args:
+            row: (이름, 참여시작시간, 참여종료시간, 공포포지션), e.g. from DataFrame.itertuples
+        """
+        return cls(**dict(zip(_ALIASES[cls], row)))
+
     class Config:
         populate_by_name = True
+        frozen = True
+
+
+# CSV column names of each row model, in field declaration order
+_ALIASES = {
+    model: [field.alias for field in model.model_fields.values()]
+    for model in (Reservation, User)
+}
 
 
 class TeamAssignment(BaseModel):
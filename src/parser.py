@@ -1,49 +1,152 @@
 """
 CSV parsing module for reservations and users.
 """
+import io
 import pandas as pd
-from typing import BinaryIO
+from operator import attrgetter
+from typing import BinaryIO, Iterable, Iterator
 from .models import Reservation, User
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # Fall back to the pandas C parser
+    pa = pa_csv = None
 
-def parse_reservations(file: BinaryIO) -> list[Reservation]:
-    """
-    Parse reservations CSV file.
+RESERVATION_COLUMNS = ["방이름", "시작시간", "종료시간", "주소", "테마", "최소인원", "적정인원", "최대인원"]
+USER_COLUMNS = ["이름", "참여시작시간", "참여종료시간", "공포포지션"]
+RESERVATION_TEXT_COLUMNS = ["방이름", "주소", "테마"]
+USER_TEXT_COLUMNS = ["이름", "공포포지션"]
+DATETIME_COLUMNS = ("시작시간", "종료시간", "참여시작시간", "참여종료시간")
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
 
-    Args:
-        file: Binary file object (from Streamlit file uploader)
 
-    Returns:
-        List of Reservation objects
+def _iter_validated(rows: Iterable, build, label: str):
+    """
+    Yield build(row) for each row.
 
-    Raises:
-        ValueError: If CSV format is invalid
+    Row errors are collected across all rows and raised together once
+    every row has been seen.
     """
-    try:
-        df = pd.read_csv(file)
+    errors = []
+
+    for line_num, row in enumerate(rows, start=2):  # Line 1 is the header
+        try:
+            yield build(row)
+        except Exception as e:
+            errors.append(f"행 {line_num}: {str(e)}")
+
+    if errors:
+        raise ValueError("\n".join([f"{label} 데이터 파싱 오류:"] + errors))
+
+
+def _iter_frame_models(frames: Iterable[pd.DataFrame], model, required_columns: list[str], label: str):
+    """Validate columns, then yield one model per row across a sequence of DataFrames."""
+
+    def rows():
+        for frame_index, df in enumerate(frames):
+            # Validate required columns
+            if frame_index == 0:
+                missing_columns = set(required_columns) - set(df.columns)
 
-        # Validate required columns
-        required_columns = ["방이름", "시작시간", "종료시간", "주소", "테마", "최소인원", "적정인원", "최대인원"]
-        missing_columns = set(required_columns) - set(df.columns)
+                if missing_columns:
+                    raise ValueError(f"필수 컬럼이 누락되었습니다: {', '.join(missing_columns)}")
 
-        if missing_columns:
-            raise ValueError(f"필수 컬럼이 누락되었습니다: {', '.join(missing_columns)}")
+            # Plain tuples in model field order, one row at a time
+            frame = _parse_datetime_columns(df[required_columns])
+            yield from frame.itertuples(index=False, name=None)
 
-        # Parse each row into Reservation model
-        reservations = []
-        errors = []
+    return _iter_validated(
+        rows(),
+        lambda row: model.from_row(tuple(map(_clean_value, row))),
+        label,
+    )
 
-        for line_num, (_, row) in enumerate(df.iterrows(), start=2):
+
+def _parse_datetime_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse text datetime columns in bulk instead of once per model.
+
+    A column with any unparseable value is left as text, so per-row
+    validation still reports exactly which rows are wrong.
+    """
+    parsed = {}
+    for column in DATETIME_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
             try:
-                reservation = Reservation(**row.to_dict())
-                reservations.append(reservation)
-            except Exception as e:
-                errors.append(f"행 {line_num}: {str(e)}")
+                parsed[column] = pd.to_datetime(df[column], format=DATETIME_FORMAT)
+            except (ValueError, TypeError):
+                pass
+    return df.assign(**parsed) if parsed else df
 
-        if errors:
-            raise ValueError("\n".join(["예약 데이터 파싱 오류:"] + errors))
 
-        return reservations
+def _clean_value(value):
+    """Map a missing cell (NaN/NaT) to None and a Timestamp to a datetime."""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if pd.isna(value):
+        return None
+    return value
+
+
+def _read_frames(
+    file: BinaryIO, chunksize: int, required_columns: list[str], text_columns: list[str]
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV as a sequence of DataFrames.
+
+    Uses PyArrow's multithreaded streaming reader when it is installed
+    and the file is binary (batches of about 1MB each), otherwise pandas
+    with `chunksize` rows per chunk. Text columns are read as strings rather than inferred, so
+    e.g. a numeric room name stays text.
+
+    PyArrow also reads the datetime columns as strings: its timestamp
+    inference accepts other formats than DATETIME_FORMAT and looks at the
+    first block only, so the values are parsed by _parse_datetime_columns
+    and the models instead, as with pandas.
+    """
+    if pa_csv is None or isinstance(file, io.TextIOBase):
+        with pd.read_csv(
+            file, chunksize=chunksize, dtype={column: "string" for column in text_columns}
+        ) as reader:
+            yield from reader
+        return
+
+    string_columns = text_columns + [c for c in required_columns if c in DATETIME_COLUMNS]
+    convert_options = pa_csv.ConvertOptions(
+        column_types={column: pa.string() for column in string_columns},
+        # Empty cells become null, as with pandas, so required text is enforced
+        strings_can_be_null=True,
+    )
+    try:
+        reader = pa_csv.open_csv(file, convert_options=convert_options)
+    except pa.ArrowInvalid as e:
+        if "Empty CSV file" in str(e):
+            raise pd.errors.EmptyDataError(str(e))
+        raise
+
+    # Header first, so column validation also runs for files without rows
+    yield reader.schema.empty_table().to_pandas()
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def _iter_models(
+    file: BinaryIO,
+    model,
+    required_columns: list[str],
+    text_columns: list[str],
+    label: str,
+    chunksize: int,
+):
+    """Read a CSV in chunks and yield one validated model per row."""
+    try:
+        yield from _iter_frame_models(
+            _read_frames(file, chunksize, required_columns, text_columns),
+            model,
+            required_columns,
+            label,
+        )
 
     except pd.errors.EmptyDataError:
         raise ValueError("CSV 파일이 비어있습니다")
@@ -51,6 +154,58 @@ def parse_reservations(file: BinaryIO) -> list[Reservation]:
         raise ValueError(f"CSV 파일을 읽을 수 없습니다: {str(e)}")
 
 
+def iter_parse_reservations(file: BinaryIO, chunksize: int = 10_000) -> Iterator[Reservation]:
+    """
+    Parse reservations CSV file incrementally.
+
+    Args:
+        file: Binary file object (from Streamlit file uploader)
+        chunksize: Number of CSV rows read into memory at a time (pandas fallback)
+
+    Yields:
+        Reservation objects
+
+    Raises:
+        ValueError: If CSV format is invalid
+    """
+    yield from _iter_models(
+        file, Reservation, RESERVATION_COLUMNS, RESERVATION_TEXT_COLUMNS, "예약", chunksize
+    )
+
+
+def iter_parse_users(file: BinaryIO, chunksize: int = 10_000) -> Iterator[User]:
+    """
+    Parse users CSV file incrementally.
+
+    Args:
+        file: Binary file object (from Streamlit file uploader)
+        chunksize: Number of CSV rows read into memory at a time (pandas fallback)
+
+    Yields:
+        User objects
+
+    Raises:
+        ValueError: If CSV format is invalid
+    """
+    yield from _iter_models(file, User, USER_COLUMNS, USER_TEXT_COLUMNS, "유저", chunksize)
+
+
+def parse_reservations(file: BinaryIO) -> list[Reservation]:
+    """
+    Parse reservations CSV file.
+
+    Args:
+        file: Binary file object (from Streamlit file uploader)
+
+    Returns:
+        List of Reservation objects
+
+    Raises:
+        ValueError: If CSV format is invalid
+    """
+    return list(iter_parse_reservations(file))
+
+
 def parse_users(file: BinaryIO) -> list[User]:
     """
     Parse users CSV file.
@@ -64,33 +219,125 @@ def parse_users(file: BinaryIO) -> list[User]:
     Raises:
         ValueError: If CSV format is invalid
     """
-    try:
-        df = pd.read_csv(file)
+    return list(iter_parse_users(file))
 
-        # Validate required columns
-        required_columns = ["이름", "참여시작시간", "참여종료시간", "공포포지션"]
-        missing_columns = set(required_columns) - set(df.columns)
 
-        if missing_columns:
-            raise ValueError(f"필수 컬럼이 누락되었습니다: {', '.join(missing_columns)}")
+def parse_reservations_frame(df: pd.DataFrame) -> list[Reservation]:
+    """
+    Parse reservations from a DataFrame with the CSV column names.
 
-        # Parse each row into User model
-        users = []
-        errors = []
+    Used for the data editor output, which is already structured and
+    does not need a CSV round-trip.
 
-        for line_num, (_, row) in enumerate(df.iterrows(), start=2):
-            try:
-                user = User(**row.to_dict())
-                users.append(user)
-            except Exception as e:
-                errors.append(f"행 {line_num}: {str(e)}")
+    Args:
+        df: Reservations DataFrame
+
+    Returns:
+        List of Reservation objects
 
-        if errors:
-            raise ValueError("\n".join(["유저 데이터 파싱 오류:"] + errors))
+    Raises:
+        ValueError: If a row is invalid or columns are missing
+    """
+    return list(_iter_frame_models([df], Reservation, RESERVATION_COLUMNS, "예약"))
 
-        return users
 
-    except pd.errors.EmptyDataError:
-        raise ValueError("CSV 파일이 비어있습니다")
-    except Exception as e:
-        raise ValueError(f"CSV 파일을 읽을 수 없습니다: {str(e)}")
+def parse_users_frame(df: pd.DataFrame) -> list[User]:
+    """
+    Parse users from a DataFrame with the CSV column names.
+
+    Used for the data editor output, which is already structured and
+    does not need a CSV round-trip.
+
+    Args:
+        df: Users DataFrame
+
+    Returns:
+        List of User objects
+
+    Raises:
+        ValueError: If a row is invalid or columns are missing
+    """
+    return list(_iter_frame_models([df], User, USER_COLUMNS, "유저"))
+
+
+_RESERVATION_FIELDS = (
+    "room_name", "start_time", "end_time", "address", "theme",
+    "min_capacity", "optimal_capacity", "max_capacity",
+)
+_USER_FIELDS = ("name", "available_from", "available_until", "horror_position")
+
+
+def _columns(items: list, fields: tuple[str, ...]) -> list[tuple]:
+    """Transpose model attributes into one tuple per field in a single pass."""
+    if not items:
+        return [()] * len(fields)
+    return list(zip(*map(attrgetter(*fields), items)))
+
+
+def _arrow_backed(df: pd.DataFrame, string_columns: list[str]) -> pd.DataFrame:
+    """
+    Convert columns to PyArrow dtypes when available, for cheap Arrow serialization.
+
+    Text columns are typed explicitly, since an empty column would
+    otherwise be inferred as integers.
+    """
+    if pa is None:
+        return df
+    string_dtype = pd.ArrowDtype(pa.string())
+    return df.astype({column: string_dtype for column in string_columns}).convert_dtypes(
+        dtype_backend="pyarrow"
+    )
+
+
+def reservations_to_frame(reservations: list[Reservation]) -> pd.DataFrame:
+    """
+    Build a columnar DataFrame of reservations using the CSV column names.
+
+    Columns are PyArrow-backed when pyarrow is installed, so Streamlit can
+    send them to the data editor without a NumPy/object conversion.
+
+    Args:
+        reservations: List of Reservation objects
+
+    Returns:
+        DataFrame with one row per reservation
+    """
+    (
+        room_names, start_times, end_times, addresses, themes,
+        min_capacities, optimal_capacities, max_capacities,
+    ) = _columns(reservations, _RESERVATION_FIELDS)
+
+    return _arrow_backed(pd.DataFrame({
+        "방이름": room_names,
+        "시작시간": pd.to_datetime(start_times),
+        "종료시간": pd.to_datetime(end_times),
+        "주소": addresses,
+        "테마": themes,
+        "최소인원": min_capacities,
+        "적정인원": optimal_capacities,
+        "최대인원": max_capacities,
+    }), RESERVATION_TEXT_COLUMNS)
+
+
+def users_to_frame(users: list[User]) -> pd.DataFrame:
+    """
+    Build a columnar DataFrame of users using the CSV column names.
+
+    Columns are PyArrow-backed when pyarrow is installed.
+
+    Args:
+        users: List of User objects
+
+    Returns:
+        DataFrame with one row per user
+    """
+    names, available_froms, available_untils, horror_positions = _columns(
+        users, _USER_FIELDS
+    )
+
+    return _arrow_backed(pd.DataFrame({
+        "이름": names,
+        "참여시작시간": pd.to_datetime(available_froms),
+        "참여종료시간": pd.to_datetime(available_untils),
+        "공포포지션": horror_positions,
+    }), USER_TEXT_COLUMNS)
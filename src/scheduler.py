@@ -2,10 +2,17 @@
 Scheduling logic and constraint validation.
 """
 from datetime import datetime, timedelta
+from itertools import combinations
+from statistics import fmean, pvariance
 from typing import List, Dict, Tuple
 from src.models import Reservation, User, TeamAssignment, Schedule
 
 
+def _format_hm(dt: datetime) -> str:
+    """Format a datetime as HH:MM without going through strftime."""
+    return f"{dt.hour:02d}:{dt.minute:02d}"
+
+
 class ScheduleConstraints:
     """Constraints for schedule generation."""
 
@@ -23,6 +30,33 @@ class ScheduleConstraints:
     MAX_GATHERING_TIME_DIFF = 30  # 30 minutes difference is acceptable
 
 
+# Constraints section of the prompt; the values are fixed, so it is built once
+CONSTRAINTS_TEXT = f"""
+제약 조건:
+1. 식사 시간:
+   - 점심: {ScheduleConstraints.LUNCH_START}:00-{ScheduleConstraints.LUNCH_END}:00 사이 {ScheduleConstraints.LUNCH_DURATION_MIN}-{ScheduleConstraints.LUNCH_DURATION_MAX}분
+   - 저녁: {ScheduleConstraints.DINNER_START}:00-{ScheduleConstraints.DINNER_END}:00 사이 {ScheduleConstraints.DINNER_DURATION}분
+   - 팀별로 식사 시간이 달라도 됨
+
+2. 공포 테마 포지션:
+   - 공포 테마가 여러 개 있으면 탱커를 분산 배치
+   - 쫄은 탱커와 같은 팀에 배정하는 것이 바람직
+
+3. 팀 인원:
+   - 각 방의 적정 인원을 기준으로 하되, ±1-2명 유연하게 허용
+
+4. 이동 시간:
+   - 이동 시간을 고려하여 물리적으로 불가능한 스케줄 제외
+
+5. 팀 균등 분배:
+   - 모든 팀이 비슷한 수의 방탈출 경험 (최우선)
+   - 테마 다양성 고려
+
+6. 회포 시간:
+   - 마지막 방탈출 종료 시간 차이 {ScheduleConstraints.MAX_GATHERING_TIME_DIFF}분 이내 (선택적)
+"""
+
+
 class ScheduleValidator:
     """Validate scheduling constraints."""
 
@@ -72,17 +106,13 @@ class ScheduleValidator:
         Returns:
             True if feasible, False otherwise
         """
-        time_gap = (
-            next_reservation.start_time - prev_reservation.end_time
-        ).total_seconds() / 60
-
         # Need at least travel_time minutes between rooms
-        return time_gap >= travel_time_minutes
+        return next_reservation.start_minute - prev_reservation.end_minute >= travel_time_minutes
 
     @staticmethod
     def needs_horror_tank(reservation: Reservation) -> bool:
         """Check if this reservation is a horror theme that needs a tank."""
-        return "공포" in reservation.theme.lower()
+        return reservation.is_horror
 
 
 class ScheduleFormatter:
@@ -95,7 +125,7 @@ class ScheduleFormatter:
         for i, r in enumerate(reservations, 1):
             lines.append(
                 f"{i}. {r.room_name}"
-                f" | {r.start_time.strftime('%H:%M')}-{r.end_time.strftime('%H:%M')}"
+                f" | {_format_hm(r.start_time)}-{_format_hm(r.end_time)}"
                 f" | {r.address}"
                 f" | {r.theme}"
                 f" | 인원: {r.min_capacity}-{r.optimal_capacity}-{r.max_capacity}명"
@@ -107,18 +137,13 @@ class ScheduleFormatter:
         """Format users as text for Claude."""
         lines = ["참여자 정보:"]
 
-        # Group by horror position
-        tanks = [u for u in users if u.horror_position == "탱커"]
-        civilians = [u for u in users if u.horror_position == "평민"]
-        scaredy_cats = [u for u in users if u.horror_position == "쫄"]
+        # Group names by horror position in one pass
+        by_position = {"탱커": [], "평민": [], "쫄": []}
+        for u in users:
+            by_position[u.horror_position].append(u.name)
 
-        lines.append(f"- 탱커 ({len(tanks)}명): {', '.join(u.name for u in tanks)}")
-        lines.append(
-            f"- 평민 ({len(civilians)}명): {', '.join(u.name for u in civilians)}"
-        )
-        lines.append(
-            f"- 쫄 ({len(scaredy_cats)}명): {', '.join(u.name for u in scaredy_cats)}"
-        )
+        for position, names in by_position.items():
+            lines.append(f"- {position} ({len(names)}명): {', '.join(names)}")
 
         return "\n".join(lines)
 
@@ -127,46 +152,27 @@ class ScheduleFormatter:
         travel_matrix: Dict[Tuple[str, str], int]
     ) -> str:
         """Format travel time matrix for Claude."""
-        lines = ["이동 시간 (분):"]
-
-        # Get unique addresses
-        addresses = list(set([addr for pair in travel_matrix.keys() for addr in pair]))
-
-        for i, start in enumerate(addresses):
-            for end in addresses[i + 1 :]:  # Only show one direction
-                time = travel_matrix.get((start, end), 0)
-                if time > 0:
-                    lines.append(f"- {start} → {end}: {time}분")
-
-        return "\n".join(lines)
+        # Get unique addresses, in first-seen order so the prompt is deterministic
+        addresses = dict.fromkeys(addr for pair in travel_matrix for addr in pair)
+
+        # Only show one direction of each pair, whichever one is stored
+        return "\n".join(
+            ["이동 시간 (분):"]
+            + [
+                f"- {start} → {end}: {time}분"
+                for start, end in combinations(addresses, 2)
+                if (
+                    time := travel_matrix.get((start, end))
+                    or travel_matrix.get((end, start), 0)
+                )
+                > 0
+            ]
+        )
 
     @staticmethod
     def format_constraints_for_claude() -> str:
         """Format scheduling constraints for Claude."""
-        return f"""
-제약 조건:
-1. 식사 시간:
-   - 점심: {ScheduleConstraints.LUNCH_START}:00-{ScheduleConstraints.LUNCH_END}:00 사이 {ScheduleConstraints.LUNCH_DURATION_MIN}-{ScheduleConstraints.LUNCH_DURATION_MAX}분
-   - 저녁: {ScheduleConstraints.DINNER_START}:00-{ScheduleConstraints.DINNER_END}:00 사이 {ScheduleConstraints.DINNER_DURATION}분
-   - 팀별로 식사 시간이 달라도 됨
-
-2. 공포 테마 포지션:
-   - 공포 테마가 여러 개 있으면 탱커를 분산 배치
-   - 쫄은 탱커와 같은 팀에 배정하는 것이 바람직
-
-3. 팀 인원:
-   - 각 방의 적정 인원을 기준으로 하되, ±1-2명 유연하게 허용
-
-4. 이동 시간:
-   - 이동 시간을 고려하여 물리적으로 불가능한 스케줄 제외
-
-5. 팀 균등 분배:
-   - 모든 팀이 비슷한 수의 방탈출 경험 (최우선)
-   - 테마 다양성 고려
-
-6. 회포 시간:
-   - 마지막 방탈출 종료 시간 차이 {ScheduleConstraints.MAX_GATHERING_TIME_DIFF}분 이내 (선택적)
-"""
+        return CONSTRAINTS_TEXT
 
 
 class ScheduleAnalyzer:
@@ -180,30 +186,21 @@ class ScheduleAnalyzer:
         Returns:
             Score from 0.0 to 1.0 (1.0 = perfectly balanced)
         """
-        if not schedule.teams:
-            return 0.0
-
         # Count number of assignments per team
         assignment_counts = [len(assignments) for assignments in schedule.teams.values()]
 
         if not assignment_counts:
             return 0.0
 
-        # Calculate variance
-        mean_count = sum(assignment_counts) / len(assignment_counts)
-        variance = sum((c - mean_count) ** 2 for c in assignment_counts) / len(
-            assignment_counts
-        )
-
-        # Convert to score (lower variance = higher score)
+        # Convert variance to score (lower variance = higher score)
         # Max expected variance is (mean_count)^2, so normalize
+        mean_count = fmean(assignment_counts)
         if mean_count == 0:
             return 1.0
 
+        variance = pvariance(assignment_counts, mu=mean_count)
         normalized_variance = variance / (mean_count**2)
-        score = max(0.0, 1.0 - normalized_variance)
-
-        return score
+        return max(0.0, 1.0 - normalized_variance)
 
     @staticmethod
     def calculate_efficiency_score(schedule: Schedule) -> float:
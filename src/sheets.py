@@ -1,12 +1,42 @@
 """
 Google Sheets export functionality.
 """
+import json
+import logging
+import random
+import re
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from pathlib import Path
 import gspread
 from google.oauth2.service_account import Credentials
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+# Notes about meals are shown in the timeline cells
+_MEAL_RE = re.compile("점심|저녁|식사")
+
+
+@lru_cache(maxsize=1)
+def _load_credentials() -> Credentials:
+    """Read and parse the service account file once per process."""
+    with open(Config.GOOGLE_SHEETS_CREDENTIALS_PATH, encoding="utf-8") as f:
+        info = json.load(f)
+    return Credentials.from_service_account_info(info, scopes=GoogleSheetsExporter.SCOPES)
+
+
+@lru_cache(maxsize=1)
+def _get_gspread_client() -> gspread.Client:
+    """
+    Authorize a gspread client once per process.
+
+    Failures are not cached, so a later call retries after the
+    credentials file is fixed. Tokens are refreshed by the credentials.
+    """
+    return gspread.authorize(_load_credentials())
+
 
 class GoogleSheetsExporter:
     """Export schedules to Google Sheets."""
@@ -19,10 +49,7 @@ class GoogleSheetsExporter:
     def __init__(self):
         """Initialize Google Sheets client."""
         try:
-            creds = Credentials.from_service_account_file(
-                Config.GOOGLE_SHEETS_CREDENTIALS_PATH, scopes=self.SCOPES
-            )
-            self.client = gspread.authorize(creds)
+            self.client = _get_gspread_client()
             self.enabled = True
         except Exception as e:
             print(f"Google Sheets initialization failed: {str(e)}")
@@ -50,7 +77,6 @@ class GoogleSheetsExporter:
 
         try:
             # Extract spreadsheet ID from URL
-            import re
             match = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', spreadsheet_url)
             if not match:
                 raise ValueError("❌ 올바른 Google Sheets URL이 아닙니다. URL 형식: https://docs.google.com/spreadsheets/d/...")
@@ -88,36 +114,31 @@ class GoogleSheetsExporter:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 sheet_title = f"{scenario.get('name', '시나리오')} - {timestamp}"
 
-            # Add new worksheet
+            # Format the schedule
+            data = self._format_timeline(scenario)
+
+            # Add, fill and format the new worksheet in a single API request
+            sheet_id = random.randint(1, 2**31 - 1)
             try:
-                worksheet = spreadsheet.add_worksheet(title=sheet_title, rows=100, cols=20)
+                spreadsheet.batch_update(
+                    {"requests": self._build_sheet_requests(sheet_id, sheet_title, data)}
+                )
             except Exception as e:
                 if "already exists" in str(e).lower():
                     # Sheet with same name exists, add number suffix
-                    import random
                     sheet_title = f"{sheet_title}_{random.randint(1000, 9999)}"
-                    worksheet = spreadsheet.add_worksheet(title=sheet_title, rows=100, cols=20)
+                    spreadsheet.batch_update(
+                        {"requests": self._build_sheet_requests(sheet_id, sheet_title, data)}
+                    )
                 else:
                     raise
 
-
-            # Format the schedule
-            data = self._format_timeline(scenario)
-
-            # Write data
-            worksheet.update("A1", data)
-
-            # Apply formatting
-            self._apply_formatting(worksheet, len(data), len(data[0]) if data else 0)
-
-            return f"{spreadsheet.url}#gid={worksheet.id}"
+            return f"{spreadsheet.url}#gid={sheet_id}"
 
         except Exception as e:
-            import traceback
             error_msg = str(e)
-            error_trace = traceback.format_exc()
             print(f"Failed to create Google Sheet: {error_msg}")
-            print(f"Full traceback:\n{error_trace}")
+            logger.debug("Google Sheet export traceback", exc_info=True)
 
             # Check for specific errors
             if "storageQuotaExceeded" in error_msg or "storage quota" in error_msg.lower():
@@ -144,52 +165,62 @@ class GoogleSheetsExporter:
         if not teams:
             return [["오류: 팀 데이터가 없습니다"]]
 
+        sorted_teams = sorted(teams.keys())
+
         # Build timeline
         data = []
 
         # Header
-        data.append(["시간"] + [f"팀 {team_id}" for team_id in sorted(teams.keys())])
+        data.append(["시간"] + [f"팀 {team_id}" for team_id in sorted_teams])
+
+        # Index assignments by start time
+        by_team_start = {
+            team_id: {assignment["start_time"]: assignment for assignment in assignments}
+            for team_id, assignments in teams.items()
+        }
 
         # Collect all time slots
-        all_times = set()
-        for assignments in teams.values():
-            for assignment in assignments:
-                all_times.add(assignment["start_time"])
-                all_times.add(assignment["end_time"])
+        all_times = {
+            time
+            for assignments in teams.values()
+            for assignment in assignments
+            for time in (assignment["start_time"], assignment["end_time"])
+        }
 
         # Sort times
-        sorted_times = sorted(list(all_times))
+        sorted_times = sorted(all_times)
 
         # Build timeline rows
-        for i in range(len(sorted_times) - 1):
-            start = sorted_times[i]
-            end = sorted_times[i + 1] if i + 1 < len(sorted_times) else ""
-
+        for start, end in zip(sorted_times, sorted_times[1:]):
             row = [f"{start}-{end}"]
 
             # For each team, find what they're doing in this time slot
-            for team_id in sorted(teams.keys()):
-                cell_content = ""
-                for assignment in teams[team_id]:
-                    if assignment["start_time"] == start:
-                        cell_content = f"{assignment['room_name']}\n({assignment['theme']})\n"
-                        member_names = assignment.get("members", [])
-                        if len(member_names) <= 3:
-                            cell_content += ", ".join(member_names)
-                        else:
-                            cell_content += f"{', '.join(member_names[:3])} 외 {len(member_names)-3}명"
-
-                        # Add travel time if exists
-                        travel = assignment.get("travel_time_from_previous", 0)
-                        if travel > 0:
-                            cell_content = f"[이동 {travel}분]\n" + cell_content
-
-                        # Add notes if exists
-                        notes = assignment.get("notes", "")
-                        if notes and "점심" in notes or "저녁" in notes or "식사" in notes:
-                            cell_content += f"\n📍 {notes}"
-
-                row.append(cell_content)
+            for team_id in sorted_teams:
+                assignment = by_team_start[team_id].get(start)
+                if assignment is None:
+                    row.append("")
+                    continue
+
+                parts = []
+
+                # Add travel time if exists
+                travel = assignment.get("travel_time_from_previous", 0)
+                if travel > 0:
+                    parts.append(f"[이동 {travel}분]\n")
+
+                parts.append(f"{assignment['room_name']}\n({assignment['theme']})\n")
+                member_names = assignment.get("members", [])
+                if len(member_names) <= 3:
+                    parts.append(", ".join(member_names))
+                else:
+                    parts.append(f"{', '.join(member_names[:3])} 외 {len(member_names)-3}명")
+
+                # Add notes if exists
+                notes = assignment.get("notes", "")
+                if notes and _MEAL_RE.search(notes):
+                    parts.append(f"\n📍 {notes}")
+
+                row.append("".join(parts))
 
             data.append(row)
 
@@ -204,24 +235,96 @@ class GoogleSheetsExporter:
 
         return data
 
-    def _apply_formatting(self, worksheet, num_rows: int, num_cols: int):
-        """Apply basic formatting to the worksheet."""
-        try:
-            # Format header row (bold, centered)
-            worksheet.format(
-                "A1:Z1",
-                {
-                    "textFormat": {"bold": True, "fontSize": 11},
-                    "horizontalAlignment": "CENTER",
-                    "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9},
-                },
-            )
+    def _build_sheet_requests(
+        self, sheet_id: int, title: str, data: List[List[str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Build batch_update requests that add a worksheet, write data and format it.
 
+        Args:
+            sheet_id: ID for the new worksheet
+            title: Title of the new worksheet
+            data: 2D array of cell values, from _format_timeline
+
+        Returns:
+            List of Sheets API requests
+        """
+        num_rows = max(100, len(data))
+        num_cols = max(20, max(map(len, data), default=0))
+
+        return [
+            {
+                "addSheet": {
+                    "properties": {
+                        "sheetId": sheet_id,
+                        "title": title,
+                        "gridProperties": {"rowCount": num_rows, "columnCount": num_cols},
+                    }
+                }
+            },
+            # Write data
+            {
+                "updateCells": {
+                    "start": {"sheetId": sheet_id, "rowIndex": 0, "columnIndex": 0},
+                    "rows": [
+                        {
+                            "values": [
+                                {"userEnteredValue": {"stringValue": str(value)}}
+                                for value in row
+                            ]
+                        }
+                        for row in data
+                    ],
+                    "fields": "userEnteredValue",
+                }
+            },
+            # Format header row (bold, centered)
+            {
+                "repeatCell": {
+                    "range": {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": 1},
+                    "cell": {
+                        "userEnteredFormat": {
+                            "textFormat": {"bold": True, "fontSize": 11},
+                            "horizontalAlignment": "CENTER",
+                            "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9},
+                        }
+                    },
+                    "fields": "userEnteredFormat(textFormat,horizontalAlignment,backgroundColor)",
+                }
+            },
             # Auto-resize columns
-            worksheet.columns_auto_resize(0, num_cols)
+            {
+                "autoResizeDimensions": {
+                    "dimensions": {
+                        "sheetId": sheet_id,
+                        "dimension": "COLUMNS",
+                        "startIndex": 0,
+                        "endIndex": len(data[0]) if data else 0,
+                    }
+                }
+            },
+        ]
 
-        except Exception as e:
-            print(f"Formatting failed (non-critical): {str(e)}")
+
+# Process-wide exporter, set once initialization succeeds
+_exporter: Optional[GoogleSheetsExporter] = None
+
+
+def get_exporter() -> GoogleSheetsExporter:
+    """
+    Shared GoogleSheetsExporter, created once per process.
+
+    An exporter whose initialization failed is returned but not kept,
+    so a later call retries after the credentials file is fixed.
+    """
+    global _exporter
+    if _exporter is not None:
+        return _exporter
+
+    exporter = GoogleSheetsExporter()
+    if exporter.enabled:
+        _exporter = exporter
+    return exporter
 
 
 class SheetsHelper:
@@ -230,8 +333,6 @@ class SheetsHelper:
     @staticmethod
     def is_available() -> bool:
         """Check if Google Sheets API is available."""
-        from pathlib import Path
-
         return Path(Config.GOOGLE_SHEETS_CREDENTIALS_PATH).exists()
 
     @staticmethod
@@ -1,11 +1,23 @@
 """
 Travel time calculation using Naver Maps API.
 """
-import requests
-from typing import Optional, Tuple
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+import httpx
+from typing import Iterable, Optional, Tuple
 from functools import lru_cache
+from pathlib import Path
 from config import Config
 
+_MS_PER_MIN = 60_000
+
+# Districts recognized by the keyword-based travel time estimate
+DISTRICTS = ("강남구", "서초구", "송파구", "강동구", "마포구", "용산구", "성동구")
+_DISTRICT_RE = re.compile("|".join(DISTRICTS))
+
 
 class NaverMapsClient:
     """Client for Naver Maps API to calculate travel times."""
@@ -13,6 +25,13 @@ class NaverMapsClient:
     GEOCODE_URL = "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
     DIRECTIONS_URL = "https://naveropenapi.apigw.ntruss.com/map-direction/v1/driving"
 
+    # Directions results persisted across restarts
+    TRAVEL_CACHE_PATH = Path(".travel_cache.db")
+    TRAVEL_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+
+    # Minimum seconds between progress callbacks during a matrix build
+    PROGRESS_INTERVAL = 0.05
+
     def __init__(self):
         """Initialize Naver Maps client with API credentials."""
         self.client_id = Config.NAVER_MAPS_CLIENT_ID
@@ -21,6 +40,72 @@ class NaverMapsClient:
         if not self.client_id or not self.client_secret:
             raise ValueError("Naver Maps API credentials are not set")
 
+        # Coordinates by address and directions results by (start, end),
+        # reused across matrix calls
+        self._coords_cache: dict[str, Tuple[float, float]] = {}
+        self._travel_time_cache: dict[Tuple[str, str], int] = {}
+
+        # Persistent travel time cache, shared by the threads using this client
+        self._db_lock = threading.Lock()
+        self._db = self._open_travel_cache()
+
+        # Keep-alive HTTP/2 connection for the synchronous API calls
+        self._client = httpx.Client(
+            headers=self._get_headers(),
+            timeout=10,
+            # Retries failed connection attempts
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            ),
+        )
+
+    def _open_travel_cache(self) -> Optional[sqlite3.Connection]:
+        """Open the persistent travel time cache, or None if it is unavailable."""
+        try:
+            conn = sqlite3.connect(self.TRAVEL_CACHE_PATH, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS travel "
+                "(s TEXT, e TEXT, mins INT, ts INT, PRIMARY KEY (s, e))"
+            )
+            return conn
+        except sqlite3.Error as e:
+            print(f"Travel cache unavailable: {str(e)}")
+            return None
+
+    def _load_travel_times(self, addresses: Iterable[str]) -> dict[Tuple[str, str], int]:
+        """Return unexpired persisted travel times between the given addresses."""
+        if self._db is None:
+            return {}
+        addresses = list(addresses)
+        placeholders = ",".join("?" * len(addresses))
+        try:
+            with self._db_lock:
+                rows = self._db.execute(
+                    f"SELECT s, e, mins FROM travel WHERE ts > ? "
+                    f"AND s IN ({placeholders}) AND e IN ({placeholders})",
+                    (int(time.time()) - self.TRAVEL_CACHE_TTL, *addresses, *addresses),
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Travel cache read failed: {str(e)}")
+            return {}
+        return {(start, end): minutes for start, end, minutes in rows}
+
+    def _save_travel_times(self, travel_times: dict[Tuple[str, str], int]) -> None:
+        """Persist fetched travel times; failures only skip caching."""
+        if self._db is None or not travel_times:
+            return
+        now = int(time.time())
+        try:
+            with self._db_lock, self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO travel (s, e, mins, ts) VALUES (?, ?, ?, ?)",
+                    [(start, end, minutes, now) for (start, end), minutes in travel_times.items()],
+                )
+        except sqlite3.Error as e:
+            print(f"Travel cache write failed: {str(e)}")
+
     def _get_headers(self) -> dict:
         """Get headers for Naver Maps API requests."""
         return {
@@ -28,39 +113,31 @@ class NaverMapsClient:
             "X-NCP-APIGW-API-KEY": self.client_secret,
         }
 
-    @lru_cache(maxsize=128)
     def geocode(self, address: str) -> Optional[Tuple[float, float]]:
         """
         Convert address to coordinates (longitude, latitude).
 
+        Shares the coordinate cache with the async matrix builder.
+
         Args:
             address: Korean address string
 
         Returns:
             Tuple of (longitude, latitude) or None if geocoding fails
         """
+        cached = self._coords_cache.get(address)
+        if cached is not None:
+            return cached
         try:
-            response = requests.get(
-                self.GEOCODE_URL,
-                headers=self._get_headers(),
-                params={"query": address},
-                timeout=10,
-            )
+            response = self._client.get(self.GEOCODE_URL, params={"query": address})
             response.raise_for_status()
-
-            data = response.json()
-
-            if data.get("status") == "OK" and data.get("addresses"):
-                first_result = data["addresses"][0]
-                longitude = float(first_result["x"])
-                latitude = float(first_result["y"])
-                return (longitude, latitude)
-
-            return None
-
+            result = self._parse_geocode(response.json())
         except Exception as e:
             print(f"Geocoding error for '{address}': {str(e)}")
             return None
+        if result is not None:
+            self._coords_cache[address] = result
+        return result
 
     @lru_cache(maxsize=256)
     def get_travel_time(
@@ -76,6 +153,10 @@ class NaverMapsClient:
         Returns:
             Travel time in minutes, or None if calculation fails
         """
+        persisted = self._load_travel_times((start_address, end_address))
+        if (start_address, end_address) in persisted:
+            return persisted[(start_address, end_address)]
+
         # Geocode addresses
         start_coords = self.geocode(start_address)
         end_coords = self.geocode(end_address)
@@ -84,76 +165,238 @@ class NaverMapsClient:
             print(f"Failed to geocode: {start_address} -> {end_address}")
             return None
 
+        duration = self.get_travel_time_by_coords(start_coords, end_coords)
+        if duration is not None:
+            self._save_travel_times({(start_address, end_address): duration})
+        return duration
+
+    def get_travel_time_by_coords(
+        self, start_coords: Tuple[float, float], end_coords: Tuple[float, float]
+    ) -> Optional[int]:
+        """
+        Calculate travel time between two already geocoded points.
+
+        Args:
+            start_coords: Starting (longitude, latitude)
+            end_coords: Destination (longitude, latitude)
+
+        Returns:
+            Travel time in minutes, or None if calculation fails
+        """
+        start_str = f"{start_coords[0]},{start_coords[1]}"
+        goal_str = f"{end_coords[0]},{end_coords[1]}"
+
         # Get directions
         try:
-            start_str = f"{start_coords[0]},{start_coords[1]}"
-            goal_str = f"{end_coords[0]},{end_coords[1]}"
-
-            response = requests.get(
+            response = self._client.get(
                 self.DIRECTIONS_URL,
-                headers=self._get_headers(),
                 params={
                     "start": start_str,
                     "goal": goal_str,
                     "option": "trafast",  # Real-time fastest route
                 },
-                timeout=10,
             )
             response.raise_for_status()
 
-            data = response.json()
-
-            if data.get("code") == 0 and data.get("route"):
-                # Get the first route's duration
-                trafast_route = data["route"].get("trafast")
-                if trafast_route and len(trafast_route) > 0:
-                    duration_ms = trafast_route[0]["summary"]["duration"]
-                    duration_minutes = duration_ms // (1000 * 60)
-                    return int(duration_minutes)
-
-            return None
+            return self._parse_duration(response.json())
 
         except Exception as e:
-            print(f"Directions error: {start_address} -> {end_address}: {str(e)}")
+            print(f"Directions error: {start_str} -> {goal_str}: {str(e)}")
             return None
 
+    @staticmethod
+    def _parse_geocode(data: dict) -> Optional[Tuple[float, float]]:
+        """Extract (longitude, latitude) from a Geocoding API response."""
+        if data.get("status") == "OK" and data.get("addresses"):
+            first_result = data["addresses"][0]
+            longitude = float(first_result["x"])
+            latitude = float(first_result["y"])
+            return (longitude, latitude)
+
+        return None
+
+    @staticmethod
+    def _parse_duration(data: dict) -> Optional[int]:
+        """Extract travel time in minutes from a Directions API response."""
+        if data.get("code") == 0 and data.get("route"):
+            # Get the first route's duration
+            trafast_route = data["route"].get("trafast")
+            if trafast_route and len(trafast_route) > 0:
+                duration_ms = trafast_route[0]["summary"]["duration"]
+                return int(duration_ms) // _MS_PER_MIN
+
+        return None
+
     def get_travel_time_matrix(
-        self, addresses: list[str], progress_callback=None
+        self, addresses: list[str], progress_callback=None, symmetric: bool = True
     ) -> dict[Tuple[str, str], int]:
         """
         Calculate travel times between all pairs of addresses.
 
+        Runs get_travel_time_matrix_async on a fresh event loop, so pairs
+        are fetched concurrently.
+
         Args:
             addresses: List of addresses
             progress_callback: Optional callback function(current, total) for progress updates
+            symmetric: Fetch each pair in one direction only and mirror it
 
         Returns:
             Dictionary mapping (start_address, end_address) to travel time in minutes
         """
-        matrix = {}
-        total_pairs = len(addresses) * (len(addresses) - 1)
-        current = 0
-
-        for i, start in enumerate(addresses):
-            for j, end in enumerate(addresses):
-                if i == j:
-                    matrix[(start, end)] = 0
-                else:
-                    travel_time = self.get_travel_time(start, end)
-                    if travel_time is not None:
-                        matrix[(start, end)] = travel_time
-                    else:
-                        # Fallback: estimate based on location keywords
-                        matrix[(start, end)] = self._estimate_travel_time(
-                            start, end
-                        )
+        return asyncio.run(
+            self.get_travel_time_matrix_async(
+                addresses, progress_callback=progress_callback, symmetric=symmetric
+            )
+        )
+
+    async def get_travel_time_matrix_async(
+        self,
+        addresses: list[str],
+        progress_callback=None,
+        concurrency: int = 10,
+        symmetric: bool = True,
+    ) -> dict[Tuple[str, str], int]:
+        """
+        Calculate travel times between all pairs of addresses concurrently.
+
+        Each address is geocoded once per client, and every directions request starts
+        as soon as both of its endpoints are geocoded. All requests share
+        one HTTP/2 connection, bounded by a semaphore.
+        Pairs resolved by an earlier call on this client, or persisted in
+        the travel cache within TRAVEL_CACHE_TTL, are not re-fetched.
+        With `symmetric`, only one direction of each pair is requested,
+        halving the directions calls; one-way roads can make the two
+        directions differ slightly, so pass False for exact times.
+
+        Args:
+            addresses: List of addresses
+            progress_callback: Optional callback function(current, total) for progress updates
+            concurrency: Maximum number of in-flight API requests
+            symmetric: Fetch each pair in one direction only and mirror it
 
-                    current += 1
-                    if progress_callback:
+        Returns:
+            Dictionary mapping (start_address, end_address) to travel time in minutes
+        """
+        matrix = {(address, address): 0 for address in addresses}
+        pairs = [
+            (start, end)
+            for i, start in enumerate(addresses)
+            for j, end in enumerate(addresses)
+            if (i < j if symmetric else i != j)
+        ]
+        total_pairs = len(pairs)
+
+        def store(start: str, end: str, minutes: int) -> None:
+            matrix[(start, end)] = minutes
+            if symmetric:
+                matrix[(end, start)] = minutes
+
+        # Reuse pairs already fetched by this client or persisted earlier
+        self._travel_time_cache.update(self._load_travel_times(addresses))
+        fetched = {}
+        pending = []
+        for start, end in pairs:
+            cached = self._travel_time_cache.get((start, end))
+            if cached is None and symmetric:
+                cached = self._travel_time_cache.get((end, start))
+            if cached is not None:
+                store(start, end, cached)
+            else:
+                pending.append((start, end))
+        current = total_pairs - len(pending)
+        last_report = 0.0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with httpx.AsyncClient(
+            http2=True, headers=self._get_headers(), timeout=10
+        ) as client:
+
+            async def geocode(address: str) -> Optional[Tuple[float, float]]:
+                cached = self._coords_cache.get(address)
+                if cached is not None:
+                    return cached
+                try:
+                    async with semaphore:
+                        response = await client.get(
+                            self.GEOCODE_URL, params={"query": address}
+                        )
+                    response.raise_for_status()
+                    result = self._parse_geocode(response.json())
+                except Exception as e:
+                    print(f"Geocoding error for '{address}': {str(e)}")
+                    return None
+                if result is not None:
+                    self._coords_cache[address] = result
+                return result
+
+            async def travel_time(start: str, end: str) -> None:
+                nonlocal current, last_report
+                start_coords = await coords[start]
+                end_coords = await coords[end]
+                duration = None
+
+                if not start_coords or not end_coords:
+                    print(f"Failed to geocode: {start} -> {end}")
+                else:
+                    try:
+                        async with semaphore:
+                            response = await client.get(
+                                self.DIRECTIONS_URL,
+                                params={
+                                    "start": f"{start_coords[0]},{start_coords[1]}",
+                                    "goal": f"{end_coords[0]},{end_coords[1]}",
+                                    "option": "trafast",  # Real-time fastest route
+                                },
+                            )
+                        response.raise_for_status()
+                        duration = self._parse_duration(response.json())
+                    except Exception as e:
+                        print(f"Directions error: {start} -> {end}: {str(e)}")
+
+                if duration is not None:
+                    store(start, end, duration)
+                    self._travel_time_cache[(start, end)] = duration
+                    fetched[(start, end)] = duration
+                else:
+                    # Fallback: estimate based on location keywords
+                    store(start, end, self._estimate_travel_time(start, end))
+
+                current += 1
+                if progress_callback:
+                    # At most one update per PROGRESS_INTERVAL, plus the final one
+                    now = time.monotonic()
+                    if current == total_pairs or now - last_report >= self.PROGRESS_INTERVAL:
+                        last_report = now
                         progress_callback(current, total_pairs)
 
+            # One geocoding task per address; each pair starts as soon as
+            # both of its endpoints resolve instead of waiting for all of them
+            coords = {
+                address: asyncio.ensure_future(geocode(address))
+                for address in dict.fromkeys(a for pair in pending for a in pair)
+            }
+            await asyncio.gather(*(travel_time(start, end) for start, end in pending))
+
+        self._save_travel_times(fetched)
         return matrix
 
+    def is_fully_fetched(self, matrix: dict[Tuple[str, str], int]) -> bool:
+        """
+        Check that every pair in a matrix came from the Directions API.
+
+        Args:
+            matrix: Matrix returned by get_travel_time_matrix on this client
+
+        Returns:
+            False if any pair holds a keyword estimate
+        """
+        cache = self._travel_time_cache
+        return all(
+            start == end or (start, end) in cache or (end, start) in cache
+            for start, end in matrix
+        )
+
     @staticmethod
     def _estimate_travel_time(start: str, end: str) -> int:
         """
@@ -167,17 +410,11 @@ class NaverMapsClient:
             Estimated travel time in minutes
         """
         # Extract districts (구)
-        start_district = None
-        end_district = None
-
-        for district in ["강남구", "서초구", "송파구", "강동구", "마포구", "용산구", "성동구"]:
-            if district in start:
-                start_district = district
-            if district in end:
-                end_district = district
+        start_match = _DISTRICT_RE.search(start)
+        end_match = _DISTRICT_RE.search(end)
 
         # Same district: 20-30 minutes
-        if start_district and start_district == end_district:
+        if start_match and end_match and start_match.group() == end_match.group():
             return 25
 
         # Different districts: 30-60 minutes
@@ -2,7 +2,7 @@
 Integration test for the full pipeline.
 """
 import sys
-from io import StringIO
+from io import BytesIO, StringIO
 from src.parser import parse_reservations, parse_users
 from src.travel import NaverMapsClient
 from src.claude_agent import ClaudeScheduler
@@ -33,11 +33,21 @@ def main():
         print(f"❌ CSV parsing failed: {e}")
         return 1
 
+    # An empty required text cell must be reported as a row error
+    # (bytes, like an upload, so the PyArrow reader is exercised)
+    empty_room_csv = reservations_csv.replace("미스터리 하우스,", ",", 1)
+    try:
+        parse_reservations(BytesIO(empty_room_csv.encode("utf-8")))
+        print("❌ Empty 방이름 was accepted")
+        return 1
+    except ValueError as e:
+        print(f"✅ Empty 방이름 rejected: {str(e).splitlines()[1]}")
+
     # Step 2: Calculate travel times
     print("\n2️⃣ Calculating travel times...")
     try:
         travel_client = NaverMapsClient()
-        addresses = list(set([r.address for r in reservations]))
+        addresses = sorted({r.address for r in reservations})
         print(f"   Addresses: {addresses}")
 
         travel_matrix = travel_client.get_travel_time_matrix(addresses)
@@ -2,7 +2,7 @@
 Test Google Sheets functionality.
 """
 from config import Config
-from src.sheets import GoogleSheetsExporter
+from src.sheets import get_exporter
 
 print("=" * 60)
 print("🧪 Google Sheets Test")
@@ -22,7 +22,7 @@ if os.path.exists(Config.GOOGLE_SHEETS_CREDENTIALS_PATH):
 # Try to initialize exporter
 print("\n2️⃣ Initializing GoogleSheetsExporter:")
 try:
-    exporter = GoogleSheetsExporter()
+    exporter = get_exporter()
     print(f"   ✅ Initialized successfully")
     print(f"   Enabled: {exporter.enabled}")
 except Exception as e:
@@ -53,7 +53,7 @@ test_scenario = {
 
 print("\n3️⃣ Creating test sheet:")
 try:
-    exporter = GoogleSheetsExporter()
+    exporter = get_exporter()
     if exporter.enabled:
         sheet_url = exporter.create_schedule_sheet(test_scenario, "TEST - Escape Room Schedule")
         if sheet_url: